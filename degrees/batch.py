@@ -0,0 +1,142 @@
+"""
+Answer many degrees-of-separation queries against one loaded graph.
+
+Reads `source,target` pairs (names or IMDB ids) one per line from a
+file or stdin and writes one JSON object per pair to stdout, in input
+order. With --workers, queries run in a pool of forked processes that
+share the loaded graph copy-on-write (and, with --compact, the pages
+of the memory-mapped snapshot).
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import sys
+
+import degrees
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("pairs", nargs="?", default="-",
+                        help="CSV file of source,target pairs (default stdin)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of worker processes")
+    degrees.add_load_arguments(parser)
+    parser.add_argument("--policy", choices=degrees.POLICIES,
+                        help="how to choose between people with one name")
+    parser.add_argument("--fuzzy", action="store_true",
+                        help="match unknown names by prefix or with typos")
+    parser.add_argument("--paths", type=int,
+                        help="list up to this many shortest paths per pair")
+    args = parser.parse_args()
+
+    degrees.load_data(args.directory, fuzzy=args.fuzzy,
+                      **degrees.load_options(args))
+
+    if args.pairs == "-":
+        f = sys.stdin
+    else:
+        f = open(args.pairs, encoding="utf-8")
+    with f:
+        queries = ((source, target, args.policy, args.fuzzy, args.paths)
+                   for source, target in read_pairs(f))
+        for results in answer_all(queries, args.workers):
+            for result in results:
+                print(json.dumps(result), flush=True)
+
+
+def read_pairs(f):
+    """
+    Yields (source, target) pairs from the non-blank rows of a CSV file.
+    """
+    for row in csv.reader(f):
+        if not row or not "".join(row).strip():
+            continue
+        if len(row) != 2:
+            yield (",".join(row), None)
+        else:
+            yield (row[0].strip(), row[1].strip())
+
+
+def answer_all(queries, workers=1):
+    """
+    Yields the answers to each query, in order, using `workers`
+    processes forked from this one.
+    """
+    if workers <= 1:
+        yield from map(answer, queries)
+        return
+
+    # Forking lets the workers inherit the loaded graph instead of
+    # pickling it or loading it again
+    context = multiprocessing.get_context("fork")
+    with context.Pool(workers) as pool:
+        yield from pool.imap(answer, queries, chunksize=64)
+
+
+def answer(query):
+    """
+    Returns a list of JSON-serialisable dicts answering one
+    (source, target, policy, fuzzy, paths) query: one dict per pair
+    of people the names resolve to, listing up to `paths` shortest
+    paths if it is given.
+    """
+    source, target, policy, fuzzy, paths = query
+    result = {"source": source, "target": target}
+    if target is None:
+        result["error"] = "expected source,target"
+        return [result]
+
+    source_ids, error = resolve(source, policy, fuzzy)
+    if error is None:
+        target_ids, error = resolve(target, policy, fuzzy)
+    if error is not None:
+        result["error"] = error
+        return [result]
+
+    results = []
+    for source_id in source_ids:
+        for target_id in target_ids:
+            path = degrees.shortest_path(source_id, target_id,
+                                         bidirectional=True)
+            result = {"source": source, "target": target,
+                      "source_id": source_id, "target_id": target_id}
+            if path is None:
+                result["degrees"] = None
+                result["path"] = None
+            else:
+                result["degrees"] = len(path)
+                result["path"] = [[movie_id, person_id]
+                                  for movie_id, person_id in path]
+            if paths is not None:
+                result["paths"] = [
+                    [[movie_id, person_id] for movie_id, person_id in path]
+                    for path in degrees.shortest_paths(source_id, target_id,
+                                                       limit=paths)
+                ]
+            results.append(result)
+    return results
+
+
+def resolve(person, policy=None, fuzzy=False):
+    """
+    Returns (person_ids, error) for an IMDB id or a name, choosing
+    between people with the same name by `policy` (see
+    degrees.POLICIES). Without a policy, ambiguous names are errors.
+    """
+    if degrees.is_person(person):
+        return [person], None
+    person_ids = degrees.candidates_for_name(person, fuzzy=fuzzy)
+    if len(person_ids) == 0:
+        return None, f"person not found: {person}"
+    if len(person_ids) > 1:
+        if policy is None:
+            return None, f"ambiguous name: {person}"
+        return degrees.disambiguate(person_ids, policy), None
+    return person_ids, None
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Benchmark shortest path search on synthetic IMDb-like datasets.
+
+Usage: python benchmark.py [--people N] [--movies N] [--queries N] ...
+
+Generates people, movies and stars CSV files (or uses an existing
+directory), runs the same random queries through each search engine
+in its own process, and prints one JSON object with, per engine, the
+load time, nodes expanded, query latency percentiles and peak memory.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import resource
+import tempfile
+import time
+from itertools import accumulate
+
+import degrees
+
+# Load options and shortest_path arguments for each engine
+ENGINES = {
+    "bfs": ({"compact": False}, {"bidirectional": False}),
+    "bidirectional": ({"compact": False}, {"bidirectional": True}),
+    "compact": ({"compact": True, "cache": False}, {})
+}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--directory",
+                        help="benchmark an existing dataset instead")
+    parser.add_argument("--output",
+                        help="write generated CSV files here and keep them")
+    parser.add_argument("--people", type=int, default=10000)
+    parser.add_argument("--movies", type=int, default=5000)
+    parser.add_argument("--cast-exponent", type=float, default=2.0,
+                        help="power-law exponent of cast sizes")
+    parser.add_argument("--max-cast", type=int, default=50,
+                        help="largest cast of any movie")
+    parser.add_argument("--fame-exponent", type=float, default=1.0,
+                        help="Zipf exponent of how often people are cast")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--engines", default=",".join(ENGINES),
+                        help="comma-separated engines to run")
+    args = parser.parse_args()
+
+    config = vars(args).copy()
+    if args.directory:
+        results = run_all(args.directory, args)
+    elif args.output:
+        os.makedirs(args.output, exist_ok=True)
+        generate(args.output, args.people, args.movies, args.cast_exponent,
+                 args.max_cast, args.fame_exponent, args.seed)
+        results = run_all(args.output, args)
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            generate(directory, args.people, args.movies, args.cast_exponent,
+                     args.max_cast, args.fame_exponent, args.seed)
+            results = run_all(directory, args)
+    print(json.dumps({"config": config, "engines": results}, indent=2))
+
+
+def generate(directory, people, movies, cast_exponent=2.0, max_cast=50,
+             fame_exponent=1.0, seed=0):
+    """
+    Writes synthetic people.csv, movies.csv and stars.csv files.
+
+    Cast sizes follow a power law with exponent `cast_exponent`, up to
+    `max_cast`, and each seat in a cast goes to person i with
+    probability proportional to 1 / (i + 1) ** `fame_exponent`, so a
+    few people star in many movies and most in one or two, as in IMDb.
+    """
+    rng = random.Random(seed)
+    with open(f"{directory}/people.csv", "w", encoding="utf-8") as f:
+        f.write("id,name,birth\n")
+        for i in range(people):
+            f.write(f'{i + 1},"Person {i % (people - people // 100)}",'
+                    f'{rng.randint(1900, 2005)}\n')
+
+    with open(f"{directory}/movies.csv", "w", encoding="utf-8") as f:
+        f.write("id,title,year\n")
+        for i in range(movies):
+            f.write(f'{i + 1},"Movie {i}",{rng.randint(1920, 2020)}\n')
+
+    weights = list(accumulate(1 / (i + 1) ** fame_exponent
+                              for i in range(people)))
+    with open(f"{directory}/stars.csv", "w", encoding="utf-8") as f:
+        f.write("person_id,movie_id\n")
+        for movie in range(movies):
+            size = min(people, max_cast,
+                       int(rng.paretovariate(cast_exponent - 1)) + 1)
+            cast = set(rng.choices(range(people), cum_weights=weights,
+                                   k=size))
+            for person in cast:
+                f.write(f"{person + 1},{movie + 1}\n")
+
+
+def run_all(directory, args):
+    """
+    Runs every requested engine in a fresh process, so that load state
+    and peak memory are not shared, and returns their results by name.
+    """
+    context = multiprocessing.get_context("fork")
+    results = {}
+    for engine in args.engines.split(","):
+        if engine not in ENGINES:
+            raise ValueError(f"unknown engine: {engine}")
+        with context.Pool(1) as pool:
+            results[engine] = pool.apply(
+                run_engine, (directory, engine, args.queries, args.seed)
+            )
+    return results
+
+
+def run_engine(directory, engine, queries, seed):
+    """
+    Loads a dataset with one engine and times random queries on it.
+    """
+    options, arguments = ENGINES[engine]
+    start = time.perf_counter()
+    degrees.load_data(directory, **options)
+    load_time = time.perf_counter() - start
+
+    expanded = count_expansions()
+    person_ids = sorted(all_person_ids())
+    rng = random.Random(seed)
+    pairs = [(rng.choice(person_ids), rng.choice(person_ids))
+             for _ in range(queries)]
+
+    latencies = []
+    lengths = []
+    for source, target in pairs:
+        start = time.perf_counter()
+        path = degrees.shortest_path(source, target, **arguments)
+        latencies.append(time.perf_counter() - start)
+        lengths.append(None if path is None else len(path))
+
+    latencies.sort()
+    return {
+        "load_seconds": load_time,
+        "queries": len(pairs),
+        "connected": sum(length is not None for length in lengths),
+        "mean_degrees": mean([length for length in lengths
+                              if length is not None]),
+        "nodes_expanded": expanded[0],
+        "latency_seconds": {
+            "p50": percentile(latencies, 50),
+            "p90": percentile(latencies, 90),
+            "p99": percentile(latencies, 99),
+            "max": latencies[-1] if latencies else None
+        },
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    }
+
+
+def count_expansions():
+    """
+    Wraps the loaded graph's neighbor function so every expansion is
+    counted, and returns a one-element list holding the count.
+    """
+    count = [0]
+
+    def counting(neighbors):
+        def wrapper(person):
+            count[0] += 1
+            return neighbors(person)
+        return wrapper
+
+    if degrees.graph is not None:
+        degrees.graph.neighbors = counting(degrees.graph.neighbors)
+    else:
+        degrees.neighbors_for_person = counting(degrees.neighbors_for_person)
+    return count
+
+
+def all_person_ids():
+    if degrees.graph is not None:
+        return [degrees.graph.person_ids[i]
+                for i in range(len(degrees.graph.person_ids))]
+    return list(degrees.people)
+
+
+def percentile(values, p):
+    """Returns the p-th percentile of sorted values (nearest rank)."""
+    if not values:
+        return None
+    return values[min(len(values) - 1, len(values) * p // 100)]
+
+
+def mean(values):
+    return sum(values) / len(values) if values else None
+
+
+if __name__ == "__main__":
+    main()
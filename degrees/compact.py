@@ -0,0 +1,333 @@
+"""
+Compact, integer-indexed representation of the degrees dataset.
+
+People and movies are numbered densely in file order, and the
+person/movie relation is stored twice as CSR (compressed sparse row)
+adjacency buffers: `person_offsets[i]:person_offsets[i + 1]` is the
+slice of `person_movies` holding the movies of person `i`, and
+`movie_offsets[m]:movie_offsets[m + 1]` the slice of `movie_stars`
+holding the stars of movie `m`. Strings live in packed UTF-8 tables,
+so the whole graph is a handful of flat buffers instead of millions
+of small dicts and sets.
+"""
+from array import array
+from bisect import bisect_left
+from collections import Counter
+
+from ingest import read_movies, read_people, read_stars
+from nameindex import NameIndex
+from snapshot import read_snapshot, write_snapshot
+from util import all_shortest_paths, bidirectional_search
+
+# Name of the snapshot file written next to the CSV files
+SNAPSHOT = "graph.snapshot"
+
+# Names of the CSV files a graph is loaded from
+SOURCES = ["people.csv", "movies.csv", "stars.csv"]
+
+# Attributes of a graph that are packed string tables and flat arrays
+TABLES = ["person_ids", "names", "births", "movie_ids", "titles", "years"]
+ARRAYS = ["person_offsets", "person_movies", "movie_offsets", "movie_stars",
+          "person_order", "movie_order", "name_order"]
+
+
+class StringTable():
+    """Sequence of strings packed end to end into one UTF-8 buffer."""
+
+    def __init__(self, data=None, offsets=None):
+        self.data = bytearray() if data is None else data
+        self.offsets = array("q", [0]) if offsets is None else offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return str(self.data[start:end], "utf-8")
+
+    def append(self, s):
+        self.data += s.encode("utf-8")
+        self.offsets.append(len(self.data))
+
+
+class CompactGraph():
+
+    def __init__(self, person_ids, names, births, movie_ids, titles, years,
+                 person_offsets, person_movies, movie_offsets, movie_stars,
+                 person_order, movie_order, name_order):
+        self.person_ids = person_ids
+        self.names = names
+        self.births = births
+        self.movie_ids = movie_ids
+        self.titles = titles
+        self.years = years
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_stars = movie_stars
+
+        # Indices sorted by person ID, movie ID and lowercase name,
+        # so lookups are binary searches rather than dicts
+        self.person_order = person_order
+        self.movie_order = movie_order
+        self.name_order = name_order
+
+        # Loading options the graph was built with (see `load`)
+        self.key = None
+
+    @classmethod
+    def from_csv(cls, directory, stats=None, min_year=None, max_year=None,
+                 min_costars=0):
+        """
+        Load the graph from the people, movies and stars CSV files,
+        counting loaded and dropped rows in `stats` (a Counter) and
+        keeping only movies that pass the filters of `ingest`.
+        """
+        if stats is None:
+            stats = Counter()
+
+        person_ids, names, births = StringTable(), StringTable(), StringTable()
+        person_index = {}
+        for person_id, name, birth in read_people(directory, stats):
+            if person_id in person_index:
+                continue
+            person_index[person_id] = len(person_index)
+            person_ids.append(person_id)
+            names.append(name)
+            births.append(birth)
+
+        movie_ids, titles, years = StringTable(), StringTable(), StringTable()
+        movie_index = {}
+        for movie_id, title, year in read_movies(directory, stats,
+                                                 min_year, max_year):
+            if movie_id in movie_index:
+                continue
+            movie_index[movie_id] = len(movie_index)
+            movie_ids.append(movie_id)
+            titles.append(title)
+            years.append(year)
+
+        # Collect (person, movie) edges as dense indices
+        star_people, star_movies = array("i"), array("i")
+        for person_id, movie_id in read_stars(
+            directory, stats, person_index.__contains__,
+            movie_index.__contains__, min_costars
+        ):
+            star_people.append(person_index[person_id])
+            star_movies.append(movie_index[movie_id])
+        del person_index, movie_index
+
+        person_offsets, person_movies = csr(
+            star_people, star_movies, len(person_ids)
+        )
+        movie_offsets, movie_stars = csr(
+            star_movies, star_people, len(movie_ids)
+        )
+        return cls(
+            person_ids, names, births, movie_ids, titles, years,
+            person_offsets, person_movies, movie_offsets, movie_stars,
+            sorted_order(person_ids), sorted_order(movie_ids),
+            sorted_order(names, key=str.lower)
+        )
+
+    @classmethod
+    def load(cls, directory, cache=True, stats=None, **filters):
+        """
+        Load the graph for a directory, memory-mapping its snapshot if
+        one is up to date with the CSV files and `filters`, and
+        otherwise parsing the CSV files (see `from_csv`) and, if
+        `cache` is true, writing a fresh snapshot.
+        """
+        path = f"{directory}/{SNAPSHOT}"
+        sources = [f"{directory}/{source}" for source in SOURCES]
+        key = snapshot_key(filters)
+        if cache:
+            buffers = read_snapshot(path, sources, key)
+            if buffers is not None:
+                graph = cls.from_buffers(buffers)
+                graph.key = key
+                return graph
+
+        graph = cls.from_csv(directory, stats, **filters)
+        graph.key = key
+        if cache:
+            try:
+                write_snapshot(path, sources, graph.buffers(), key)
+            except OSError:
+                pass
+        return graph
+
+    @classmethod
+    def from_buffers(cls, buffers):
+        """Builds a graph over buffers named as in `buffers()`."""
+        tables = [
+            StringTable(buffers[f"{name}.data"], buffers[f"{name}.offsets"])
+            for name in TABLES
+        ]
+        arrays = [buffers[name] for name in ARRAYS]
+        return cls(*tables, *arrays)
+
+    def buffers(self):
+        """Returns a dict of the flat buffers that make up the graph."""
+        buffers = {}
+        for name in TABLES:
+            table = getattr(self, name)
+            buffers[f"{name}.data"] = table.data
+            buffers[f"{name}.offsets"] = table.offsets
+        for name in ARRAYS:
+            buffers[name] = getattr(self, name)
+        return buffers
+
+    def person_index(self, person_id):
+        """Returns the dense index of a person ID, or None."""
+        return find(self.person_order, self.person_ids, person_id)
+
+    def movie_index(self, movie_id):
+        """Returns the dense index of a movie ID, or None."""
+        return find(self.movie_order, self.movie_ids, movie_id)
+
+    def person_ids_for_name(self, name):
+        """Returns the IDs of everyone with the given name, ignoring case."""
+        name = name.lower()
+        names = SortedNames(self)
+        person_ids = []
+        i = bisect_left(names, name)
+        while i < len(names) and names[i] == name:
+            person_ids.append(self.person_ids[self.name_order[i]])
+            i += 1
+        return person_ids
+
+    def name_index(self):
+        """Returns a `NameIndex` over the graph's people."""
+        return NameIndex(
+            SortedNames(self),
+            lambda i: [self.person_ids[self.name_order[i]]]
+        )
+
+    def name(self, person_id):
+        return self.names[self.person_index(person_id)]
+
+    def birth(self, person_id):
+        return self.births[self.person_index(person_id)]
+
+    def title(self, movie_id):
+        return self.titles[self.movie_index(movie_id)]
+
+    def movie_count(self, person_id):
+        person = self.person_index(person_id)
+        return self.person_offsets[person + 1] - self.person_offsets[person]
+
+    def neighbors(self, person):
+        """
+        Yields (movie, person) index pairs for people who starred
+        with the person at a given index.
+        """
+        movie_offsets, movie_stars = self.movie_offsets, self.movie_stars
+        start = self.person_offsets[person]
+        end = self.person_offsets[person + 1]
+        for movie in self.person_movies[start:end]:
+            first, last = movie_offsets[movie], movie_offsets[movie + 1]
+            for star in movie_stars[first:last]:
+                yield movie, star
+
+    def neighbors_for_person(self, person_id):
+        """
+        Yields (movie_id, person_id) pairs for people who starred
+        with a given person.
+        """
+        for movie, star in self.neighbors(self.person_index(person_id)):
+            yield self.movie_ids[movie], self.person_ids[star]
+
+    def shortest_path(self, source, target):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect the source to the target.
+
+        If no possible path, returns None.
+        """
+        path = bidirectional_search(
+            self.person_index(source), self.person_index(target),
+            self.neighbors
+        )
+        if path is None:
+            return None
+        return [(self.movie_ids[movie], self.person_ids[person])
+                for movie, person in path]
+
+    def shortest_paths(self, source, target):
+        """
+        Yields every shortest list of (movie_id, person_id) pairs that
+        connect the source to the target, lazily.
+        """
+        for path in all_shortest_paths(self.person_index(source),
+                                       self.person_index(target),
+                                       self.neighbors):
+            yield [(self.movie_ids[movie], self.person_ids[person])
+                   for movie, person in path]
+
+
+class SortedNames():
+    """Lowercase names of a graph's people, in sorted order."""
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __len__(self):
+        return len(self.graph.name_order)
+
+    def __getitem__(self, i):
+        return self.graph.names[self.graph.name_order[i]].lower()
+
+
+def snapshot_key(filters):
+    """
+    Returns the options a graph was filtered with, or None if it was
+    not, as stored in its snapshot.
+    """
+    key = {name: value for name, value in filters.items()
+           if value is not None and value != 0}
+    return key or None
+
+
+def csr(rows, columns, n):
+    """
+    Groups `columns` by `rows` (both index arrays of equal length)
+    into an offsets array of length n + 1 and a values array, keeping
+    each (row, column) pair once, as the dict graph's sets do.
+    """
+    offsets = array("q", bytes(8 * (n + 1)))
+    for row in rows:
+        offsets[row + 1] += 1
+    for i in range(n):
+        offsets[i + 1] += offsets[i]
+
+    position = offsets[:-1]
+    values = array("i", bytes(4 * len(columns)))
+    for row, column in zip(rows, columns):
+        values[position[row]] = column
+        position[row] += 1
+
+    # Repeated stars.csv rows would otherwise repeat edges
+    unique = array("i")
+    start = 0
+    for i in range(n):
+        end = offsets[i + 1]
+        unique.extend(dict.fromkeys(values[start:end]))
+        offsets[i + 1] = len(unique)
+        start = end
+    return offsets, unique
+
+
+def sorted_order(table, key=None):
+    """Returns the indices of `table` in order of their (keyed) strings."""
+    if key is None:
+        return array("i", sorted(range(len(table)), key=table.__getitem__))
+    return array("i", sorted(range(len(table)), key=lambda i: key(table[i])))
+
+
+def find(order, table, value):
+    """Binary searches `order` for the index whose string is `value`."""
+    i = bisect_left(order, value, key=table.__getitem__)
+    if i < len(order) and table[order[i]] == value:
+        return order[i]
+    return None
@@ -0,0 +1,117 @@
+"""
+Connected components of the co-star graph.
+
+People who starred in a movie together are joined with a union-find
+pass over every cast, and each person is labelled with a dense
+component number, so whether two people are connected at all is two
+array lookups. For a `CompactGraph` the labels are saved as a snapshot
+next to the CSV files and reused while it is up to date.
+"""
+from array import array
+
+from compact import SOURCES
+from snapshot import read_snapshot, write_snapshot
+
+# Name of the snapshot file written next to the CSV files
+SNAPSHOT = "components.snapshot"
+
+
+class Components():
+
+    def __init__(self, labels, sizes, index):
+        # Component of each person and number of people in each component
+        self.labels = labels
+        self.sizes = sizes
+
+        # Maps a person_id to its position in `labels`
+        self.index = index
+
+    @classmethod
+    def from_casts(cls, n, casts, index):
+        """
+        Labels the components of `n` people, numbered 0 to n - 1,
+        given an iterable of each movie's cast as lists of numbers.
+        """
+        parent = array("i", range(n))
+
+        def find(person):
+            while parent[person] != person:
+                parent[person] = parent[parent[person]]
+                person = parent[person]
+            return person
+
+        for cast in casts:
+            if len(cast) < 2:
+                continue
+            root = find(cast[0])
+            for star in cast[1:]:
+                other = find(star)
+                if other != root:
+                    parent[other] = root
+
+        labels = array("i", bytes(4 * n))
+        sizes = array("i")
+        numbers = {}
+        for person in range(n):
+            root = find(person)
+            if root not in numbers:
+                numbers[root] = len(sizes)
+                sizes.append(0)
+            labels[person] = numbers[root]
+            sizes[labels[person]] += 1
+        return cls(labels, sizes, index)
+
+    @classmethod
+    def from_graph(cls, graph):
+        """Labels the components of a `CompactGraph`."""
+        offsets, stars = graph.movie_offsets, graph.movie_stars
+        casts = (stars[offsets[movie]:offsets[movie + 1]]
+                 for movie in range(len(graph.movie_ids)))
+        return cls.from_casts(len(graph.person_ids), casts,
+                              graph.person_index)
+
+    @classmethod
+    def from_dicts(cls, people, movies):
+        """Labels the components of the `people` and `movies` dicts."""
+        position = {person_id: i for i, person_id in enumerate(people)}
+        casts = ([position[person_id] for person_id in movie["stars"]]
+                 for movie in movies.values())
+        return cls.from_casts(len(position), casts, position.get)
+
+    @classmethod
+    def load(cls, graph, directory, cache=True):
+        """
+        Returns the components of a `CompactGraph` loaded for a
+        directory, from their snapshot if it is up to date, and
+        otherwise labelled afresh (and saved, if `cache` is true).
+        """
+        path = f"{directory}/{SNAPSHOT}"
+        sources = [f"{directory}/{source}" for source in SOURCES]
+        if cache:
+            buffers = read_snapshot(path, sources, graph.key)
+            if buffers is not None:
+                return cls(buffers["labels"], buffers["sizes"],
+                           graph.person_index)
+
+        components = cls.from_graph(graph)
+        if cache:
+            try:
+                write_snapshot(path, sources, {
+                    "labels": components.labels,
+                    "sizes": components.sizes
+                }, graph.key)
+            except OSError:
+                pass
+        return components
+
+    def component(self, person_id):
+        """Returns the component number of a person."""
+        return self.labels[self.index(person_id)]
+
+    def connected(self, source, target):
+        """Returns whether there is any path between two people."""
+        return self.component(source) == self.component(target)
+
+    def size(self, person_id):
+        """Returns the number of people in a person's component."""
+        return self.sizes[self.component(person_id)]
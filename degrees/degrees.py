@@ -1,7 +1,15 @@
-import csv
+import argparse
+import itertools
 import sys
+from collections import Counter
 
-from util import Node, StackFrontier, QueueFrontier
+from compact import CompactGraph
+from components import Components
+from ingest import read_movies, read_people, read_stars
+from nameindex import NameIndex
+from tree import load_trees, reverse_path
+from util import (Node, StackFrontier, QueueFrontier, all_shortest_paths,
+                  bidirectional_search)
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -12,56 +20,104 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Integer-indexed graph used instead of the dicts above when loaded compactly
+graph = None
 
+# Maps person_ids to precomputed shortest path trees from them (see hubs.py)
+trees = {}
 
-def load_data(directory):
+# Prefix and typo-tolerant name lookups, built by load_data
+name_index = None
+
+# Connected components of the loaded graph, labelled by load_data
+components = None
+
+# Ways to choose between several people with the same name without asking
+POLICIES = ["most-movies", "earliest-birth", "all"]
+
+
+def load_data(directory, compact=False, cache=True, min_year=None,
+              max_year=None, min_costars=0, fuzzy=False):
     """
     Load data from CSV files into memory.
+
+    If `compact` is true, load into a `CompactGraph` instead of the
+    `names`, `people` and `movies` dicts, reusing the binary snapshot
+    next to the CSV files when it is up to date (and `cache` is true),
+    along with its connected components and any shortest path trees
+    precomputed for it.
+
+    Only movies released between `min_year` and `max_year` and whose
+    stars each have at least `min_costars` co-stars are loaded.
+
+    If `fuzzy` is true, the name index's typo-tolerant postings are
+    built now rather than on the first fuzzy lookup, so that processes
+    forked afterwards share them instead of each building their own.
+
+    Returns a Counter of the rows loaded and dropped (empty when the
+    compact graph comes from its snapshot).
     """
+    global graph, name_index, components
+    stats = Counter()
+    if compact:
+        graph = CompactGraph.load(directory, cache=cache, stats=stats,
+                                  min_year=min_year, max_year=max_year,
+                                  min_costars=min_costars)
+        trees.update(load_trees(graph, directory))
+        name_index = graph.name_index()
+        if fuzzy:
+            name_index.build()
+        components = Components.load(graph, directory, cache=cache)
+        return stats
+
     # Load people
-    with open(f"{directory}/people.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            people[row["id"]] = {
-                "name": row["name"],
-                "birth": row["birth"],
-                "movies": set()
-            }
-            if row["name"].lower() not in names:
-                names[row["name"].lower()] = {row["id"]}
-            else:
-                names[row["name"].lower()].add(row["id"])
+    for person_id, name, birth in read_people(directory, stats):
+        people[person_id] = {
+            "name": name,
+            "birth": birth,
+            "movies": set()
+        }
+        if name.lower() not in names:
+            names[name.lower()] = {person_id}
+        else:
+            names[name.lower()].add(person_id)
 
     # Load movies
-    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            movies[row["id"]] = {
-                "title": row["title"],
-                "year": row["year"],
-                "stars": set()
-            }
+    for movie_id, title, year in read_movies(directory, stats,
+                                             min_year, max_year):
+        movies[movie_id] = {
+            "title": title,
+            "year": year,
+            "stars": set()
+        }
 
     # Load stars
-    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                people[row["person_id"]]["movies"].add(row["movie_id"])
-                movies[row["movie_id"]]["stars"].add(row["person_id"])
-            except KeyError:
-                pass
+    for person_id, movie_id in read_stars(
+        directory, stats, people.__contains__, movies.__contains__,
+        min_costars
+    ):
+        people[person_id]["movies"].add(movie_id)
+        movies[movie_id]["stars"].add(person_id)
+
+    keys = sorted(names)
+    name_index = NameIndex(keys, lambda i: sorted(names[keys[i]]))
+    if fuzzy:
+        name_index.build()
+    components = Components.from_dicts(people, movies)
+    return stats
 
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    parser = argparse.ArgumentParser()
+    parser.add_argument("directory", nargs="?", default="large")
+    add_load_arguments(parser)
+    args = parser.parse_args()
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
+    stats = load_data(args.directory, **load_options(args))
     print("Data loaded.")
+    report_dropped(stats)
 
     source = person_id_for_name(input("Name: "))
     if source is None:
@@ -70,7 +126,7 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    path = shortest_path(source, target, bidirectional=True)
 
     if path is None:
         print("Not connected.")
@@ -79,21 +135,80 @@ def main():
         print(f"{degrees} degrees of separation.")
         path = [(None, source)] + path
         for i in range(degrees):
-            person1 = people[path[i][1]]["name"]
-            person2 = people[path[i + 1][1]]["name"]
-            movie = movies[path[i + 1][0]]["title"]
+            person1 = person_name(path[i][1])
+            person2 = person_name(path[i + 1][1])
+            movie = movie_title(path[i + 1][0])
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def add_load_arguments(parser):
+    """
+    Adds the options of `load_data` to an argparse parser.
+    """
+    parser.add_argument("--compact", action="store_true",
+                        help="load an integer-indexed graph to save memory")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="ignore and do not write the compact snapshot")
+    parser.add_argument("--min-year", type=int,
+                        help="only load movies released in or after this year")
+    parser.add_argument("--max-year", type=int,
+                        help="only load movies released in or before "
+                             "this year")
+    parser.add_argument("--min-costars", type=int, default=0,
+                        help="only load movies whose stars have this many "
+                             "co-stars")
+
+
+def load_options(args):
+    """
+    Returns the keyword arguments to `load_data` from parsed arguments.
+    """
+    return {
+        "compact": args.compact,
+        "cache": not args.no_cache,
+        "min_year": args.min_year,
+        "max_year": args.max_year,
+        "min_costars": args.min_costars
+    }
+
+
+def report_dropped(stats):
+    """
+    Prints how many rows `load_data` dropped, if any.
+    """
+    dropped = {
+        "dangling_people": "stars of unknown people",
+        "dangling_movies": "stars of unknown or filtered movies",
+        "filtered_movies": "movies outside the year range",
+        "filtered_stars": "stars with too few co-stars"
+    }
+    for key, description in dropped.items():
+        if stats[key]:
+            print(f"Dropped {stats[key]} {description}.")
+
+
+def shortest_path(source, target, bidirectional=False):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
+    If `bidirectional` is true, searches from both ends at once
+    (see `bidirectional_shortest_path`).
+
     If no possible path, returns None.
     """
+    if components is not None and not components.connected(source, target):
+        return None
+    if source in trees:
+        return trees[source].path_to(target)
+    if target in trees:
+        path = trees[target].path_to(source)
+        return None if path is None else reverse_path(target, path)
+    if graph is not None:
+        return graph.shortest_path(source, target)
+    if bidirectional:
+        return bidirectional_shortest_path(source, target)
 
-    # TODO
     start=Node(state=source,parent=None,action=None)
     frontier=QueueFrontier()
     frontier.add(start)
@@ -122,26 +237,55 @@ def shortest_path(source, target):
                 frontier.add(child)
 
 
+def bidirectional_shortest_path(source, target):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, in the same format
+    as `shortest_path`, searching from both ends at once.
 
+    If no possible path, returns None.
+    """
+    return bidirectional_search(source, target, neighbors_for_person)
 
 
-    raise NotImplementedError
+def shortest_paths(source, target, limit=None):
+    """
+    Yields shortest lists of (movie_id, person_id) pairs that connect
+    the source to the target, lazily, up to `limit` of them (or all
+    of them if `limit` is None).
+
+    Yields nothing if there is no possible path.
+    """
+    if components is not None and not components.connected(source, target):
+        return
+    if graph is not None:
+        paths = graph.shortest_paths(source, target)
+    else:
+        paths = all_shortest_paths(source, target, neighbors_for_person)
+    yield from itertools.islice(paths, limit)
 
 
-def person_id_for_name(name):
+def person_id_for_name(name, policy=None):
     """
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
+
+    Ambiguities are resolved by asking, unless `policy` names one of
+    the non-interactive POLICIES. The "all" policy picks more than one
+    person, so it is a ValueError here; use `disambiguate` for it.
     """
-    person_ids = list(names.get(name.lower(), set()))
+    if policy == "all":
+        raise ValueError("policy 'all' can choose several people")
+    person_ids = person_ids_for_name(name)
     if len(person_ids) == 0:
         return None
+    elif len(person_ids) > 1 and policy is not None:
+        return disambiguate(person_ids, policy)[0]
     elif len(person_ids) > 1:
         print(f"Which '{name}'?")
         for person_id in person_ids:
-            person = people[person_id]
-            name = person["name"]
-            birth = person["birth"]
+            name = person_name(person_id)
+            birth = person_birth(person_id)
             print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
         try:
             person_id = input("Intended Person ID: ")
@@ -154,11 +298,60 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+def person_ids_for_name(name):
+    """
+    Returns a list of the IMDB ids of everyone with a given name.
+    """
+    if graph is not None:
+        return graph.person_ids_for_name(name)
+    return list(names.get(name.lower(), set()))
+
+
+def candidates_for_name(name, fuzzy=False):
+    """
+    Returns a list of the IMDB ids of everyone with a given name,
+    falling back, if `fuzzy` is true and nobody has exactly that name,
+    to people whose names start with it or are a couple of typos away.
+    """
+    person_ids = name_index.exact(name)
+    if person_ids or not fuzzy:
+        return person_ids
+    return name_index.prefix(name) or name_index.fuzzy(name)
+
+
+def disambiguate(person_ids, policy):
+    """
+    Returns the list of person_ids chosen from candidates by a policy:
+    the one in the most movies, the one born first, or all of them.
+    """
+    if policy == "all":
+        return list(person_ids)
+    elif policy == "most-movies":
+        return [max(person_ids, key=movie_count)]
+    elif policy == "earliest-birth":
+        # Unknown births sort after every known year
+        return [min(person_ids, key=lambda person_id: (
+            not person_birth(person_id), person_birth(person_id)
+        ))]
+    raise ValueError(f"unknown policy: {policy}")
+
+
+def is_person(person_id):
+    """
+    Returns whether a person with the given IMDB id is loaded.
+    """
+    if graph is not None:
+        return graph.person_index(person_id) is not None
+    return person_id in people
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
+    if graph is not None:
+        return set(graph.neighbors_for_person(person_id))
     movie_ids = people[person_id]["movies"]
     neighbors = set()
     for movie_id in movie_ids:
@@ -167,5 +360,29 @@ def neighbors_for_person(person_id):
     return neighbors
 
 
+def person_name(person_id):
+    if graph is not None:
+        return graph.name(person_id)
+    return people[person_id]["name"]
+
+
+def person_birth(person_id):
+    if graph is not None:
+        return graph.birth(person_id)
+    return people[person_id]["birth"]
+
+
+def movie_count(person_id):
+    if graph is not None:
+        return graph.movie_count(person_id)
+    return len(people[person_id]["movies"])
+
+
+def movie_title(movie_id):
+    if graph is not None:
+        return graph.title(movie_id)
+    return movies[movie_id]["title"]
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,65 @@
+"""
+Precompute shortest path trees from hub actors.
+
+Usage: python hubs.py directory [hub ...] [--file hubs.txt] [--policy P]
+
+Each hub is a name or IMDB id. Names shared by several people are
+skipped unless --policy chooses between them (see degrees.POLICIES;
+"all" makes every one of them a hub). Later runs of degrees.py and batch.py
+with --compact (and the same filters) answer any query from (or to) a
+hub from its tree.
+"""
+import argparse
+import sys
+
+import degrees
+from tree import ShortestPathTree
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("directory")
+    parser.add_argument("hubs", nargs="*", help="names or IMDB ids")
+    parser.add_argument("--file", help="file listing one hub per line")
+    parser.add_argument("--policy", choices=degrees.POLICIES,
+                        help="how to choose between people with one name")
+    degrees.add_load_arguments(parser)
+    args = parser.parse_args()
+
+    hubs = list(args.hubs)
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            hubs.extend(line.strip() for line in f if line.strip())
+    if not hubs:
+        sys.exit("No hubs given.")
+
+    print("Loading data...")
+    options = degrees.load_options(args)
+    options["compact"] = True
+    stats = degrees.load_data(args.directory, **options)
+    print("Data loaded.")
+    degrees.report_dropped(stats)
+
+    for hub in hubs:
+        if degrees.is_person(hub):
+            sources = [hub]
+        else:
+            sources = degrees.person_ids_for_name(hub)
+        if not sources:
+            print(f"{hub}: person not found.")
+            continue
+        if len(sources) > 1:
+            if args.policy is None:
+                print(f"{hub}: ambiguous name "
+                      f"({', '.join(sorted(sources))}), skipped.")
+                continue
+            sources = degrees.disambiguate(sources, args.policy)
+        for source in sources:
+            tree = ShortestPathTree.build(degrees.graph, source)
+            tree.save(args.directory)
+            reached = sum(1 for distance in tree.distance if distance != -1)
+            print(f"{hub} ({source}): {reached} people reachable.")
+
+
+if __name__ == "__main__":
+    main()
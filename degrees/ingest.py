@@ -0,0 +1,89 @@
+"""
+Streaming readers for the people, movies and stars CSV files.
+
+Rows are parsed with `csv.reader` over a large read buffer into plain
+tuples (rather than a dict per row as with `csv.DictReader`), and IDs
+and years are interned so the many repeats of each one share a single
+string. Rows that are filtered out or refer to unknown people or movies
+are counted in a `collections.Counter` of load statistics.
+"""
+import csv
+import sys
+from collections import Counter
+
+# Bytes read from a CSV file at a time
+BUFFER = 1 << 20
+
+
+def read_table(path, columns):
+    """
+    Yields a tuple of the named columns for each row of a CSV file.
+    """
+    with open(path, encoding="utf-8", newline="", buffering=BUFFER) as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        indices = [header.index(column) for column in columns]
+        for row in reader:
+            if row:
+                yield tuple(row[i] for i in indices)
+
+
+def read_people(directory, stats):
+    """Yields (id, name, birth) for each person."""
+    for person_id, name, birth in read_table(
+        f"{directory}/people.csv", ["id", "name", "birth"]
+    ):
+        stats["people"] += 1
+        yield sys.intern(person_id), name, sys.intern(birth)
+
+
+def read_movies(directory, stats, min_year=None, max_year=None):
+    """
+    Yields (id, title, year) for each movie released between `min_year`
+    and `max_year` (inclusive, when given). Movies without a year are
+    dropped if either bound is given.
+    """
+    for movie_id, title, year in read_table(
+        f"{directory}/movies.csv", ["id", "title", "year"]
+    ):
+        if min_year is not None or max_year is not None:
+            if not year.isdigit() or not (
+                (min_year is None or int(year) >= min_year)
+                and (max_year is None or int(year) <= max_year)
+            ):
+                stats["filtered_movies"] += 1
+                continue
+        stats["movies"] += 1
+        yield sys.intern(movie_id), title, sys.intern(year)
+
+
+def read_stars(directory, stats, is_person, is_movie, min_costars=0):
+    """
+    Yields (person_id, movie_id) for each star whose person and movie
+    pass `is_person` and `is_movie`, counting the others as dangling
+    (including stars of movies dropped by `read_movies`' filters).
+
+    If `min_costars` is given, also drops stars of movies in which each
+    star has fewer than that many co-stars, which takes an extra pass
+    over the file to count every movie's cast.
+    """
+    path = f"{directory}/stars.csv"
+    columns = ["person_id", "movie_id"]
+
+    cast = None
+    if min_costars > 0:
+        cast = Counter(
+            movie_id for person_id, movie_id in read_table(path, columns)
+            if is_person(person_id) and is_movie(movie_id)
+        )
+
+    for person_id, movie_id in read_table(path, columns):
+        if not is_person(person_id):
+            stats["dangling_people"] += 1
+        elif not is_movie(movie_id):
+            stats["dangling_movies"] += 1
+        elif cast is not None and cast[movie_id] - 1 < min_costars:
+            stats["filtered_stars"] += 1
+        else:
+            stats["stars"] += 1
+            yield sys.intern(person_id), sys.intern(movie_id)
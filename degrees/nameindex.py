@@ -0,0 +1,173 @@
+"""
+Prefix and typo-tolerant lookup of people by name.
+
+The index sits over a sorted sequence of lowercase names, so exact and
+prefix lookups are binary searches. Typo-tolerant lookups use postings
+of positional trigrams (a trigram and where it starts in the name) to
+find candidate names sharing enough trigrams with the query near the
+same place, and then check their edit distance. The postings are built
+by `build` (or on first use); build them before forking workers so
+that the workers share them.
+"""
+from array import array
+from bisect import bisect_left
+from collections import Counter
+
+# Most postings read per fuzzy lookup: trigrams, rarest first, that
+# would go over this are too common to find candidates with, and are
+# assumed to be shared by every candidate
+MAX_POSTINGS = 20000
+
+# Most candidates, by trigrams shared, whose edit distance is checked
+MAX_CANDIDATES = 100
+
+
+class NameIndex():
+
+    def __init__(self, keys, person_ids):
+        """
+        `keys` is a sorted sequence of lowercase names (repeats allowed)
+        and `person_ids(i)` returns the IMDB ids of the people with
+        the name `keys[i]`.
+        """
+        self.keys = keys
+        self.person_ids = person_ids
+
+        # Maps (trigram, start) pairs to positions in `keys` of names
+        # with that trigram at that start
+        self.postings = None
+
+    def build(self):
+        """Builds the trigram postings for typo-tolerant lookups."""
+        if self.postings is None:
+            self.postings = build_postings(self.keys)
+
+    def exact(self, name):
+        """Returns the ids of everyone with the given name."""
+        name = name.lower()
+        return self.collect(bisect_left(self.keys, name),
+                            lambda key: key == name)
+
+    def prefix(self, prefix, limit=10):
+        """
+        Returns the ids of up to `limit` people whose names start with
+        `prefix`, in name order.
+        """
+        prefix = prefix.lower()
+        return self.collect(bisect_left(self.keys, prefix),
+                            lambda key: key.startswith(prefix), limit)
+
+    def fuzzy(self, name, distance=2, limit=10):
+        """
+        Returns the ids of up to `limit` people whose names are within
+        `distance` edits of `name`, closest first.
+        """
+        self.build()
+        name = name.lower()
+
+        # Each edit changes at most three trigrams of a name, and moves
+        # the rest by at most one place, so a match shares at least
+        # `needed` of the query's trigrams within `distance` places
+        grams = positional_trigrams(name)
+        needed = len(grams) - 3 * distance
+        windows = sorted(
+            ([self.postings.get((gram, position), ())
+              for position in range(start - distance,
+                                    start + distance + 1)]
+             for start, gram in grams),
+            key=lambda postings: sum(map(len, postings))
+        )
+
+        # Rarest first, so a name made only of common trigrams still
+        # finds candidates through its least common one
+        shared = Counter()
+        read = 0
+        for postings in windows:
+            size = sum(map(len, postings))
+            if shared and read + size > MAX_POSTINGS:
+                needed -= 1
+                continue
+            read += size
+            for posting in postings:
+                shared.update(posting)
+        needed = max(1, needed)
+
+        matches = []
+        for position, count in shared.most_common(MAX_CANDIDATES):
+            if count < needed:
+                break
+            edits = edit_distance(name, self.keys[position], distance)
+            if edits <= distance:
+                matches.append((edits, self.keys[position], position))
+        matches.sort()
+
+        person_ids = []
+        for _, key, position in matches:
+            person_ids.extend(self.collect(position, lambda k: k == key))
+            if len(person_ids) >= limit:
+                break
+        return person_ids[:limit]
+
+    def collect(self, start, matches, limit=None):
+        """
+        Returns the ids for consecutive keys from `start` that match.
+        """
+        person_ids = []
+        i = start
+        while i < len(self.keys) and matches(self.keys[i]):
+            person_ids.extend(self.person_ids(i))
+            if limit is not None and len(person_ids) >= limit:
+                return person_ids[:limit]
+            i += 1
+        return person_ids
+
+
+def positional_trigrams(name):
+    """
+    Returns the (start, trigram) pairs of a name, padded at both ends.
+    """
+    padded = f"  {name} "
+    return [(i, padded[i:i + 3]) for i in range(len(padded) - 2)]
+
+
+def build_postings(keys):
+    """
+    Maps each (trigram, start) pair to the positions of the first of
+    each run of equal keys containing that trigram at that start.
+    """
+    postings = {}
+    previous = None
+    for position in range(len(keys)):
+        key = keys[position]
+        if key == previous:
+            continue
+        previous = key
+        for start, gram in positional_trigrams(key):
+            posting = postings.get((gram, start))
+            if posting is None:
+                posting = postings[gram, start] = []
+            posting.append(position)
+    return {pair: array("i", posting) for pair, posting in postings.items()}
+
+
+def edit_distance(a, b, limit):
+    """
+    Returns the Levenshtein distance between two strings, or any
+    value above `limit` once it is certain to exceed it.
+    """
+    beyond = limit + 1
+    if abs(len(a) - len(b)) > limit:
+        return beyond
+
+    # Only cells within `limit` of the diagonal can stay within it
+    previous = [min(j, beyond) for j in range(len(b) + 1)]
+    for i, ca in enumerate(a, 1):
+        current = [beyond] * (len(b) + 1)
+        current[0] = min(i, beyond)
+        for j in range(max(1, i - limit), min(len(b), i + limit) + 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1,
+                             previous[j - 1] + (ca != b[j - 1]))
+        if min(current) > limit:
+            return beyond
+        previous = current
+    return min(previous[-1], beyond)
@@ -0,0 +1,123 @@
+"""
+Versioned binary snapshots of flat buffers, memory-mapped on load.
+
+A snapshot file is laid out as
+
+    MAGIC | header length (8 bytes) | JSON header | buffers...
+
+where the header records the snapshot version, a fingerprint of the
+source files it was built from, and the offset, size and format of
+each named buffer. Every buffer starts on an 8-byte boundary so it
+can be cast in place to the array type it was written from.
+"""
+import hashlib
+import json
+import mmap
+import os
+
+MAGIC = b"DEGSNAP\0"
+VERSION = 3
+
+# Bytes hashed from each end of a source file for its fingerprint
+SAMPLE = 1 << 16
+
+
+def fingerprint(paths):
+    """
+    Returns a fingerprint of the given files: their size, modification
+    time and a hash of their first and last SAMPLE bytes. Hashing only
+    the ends keeps checking a multi-gigabyte CSV instant.
+    """
+    result = {}
+    for path in paths:
+        stat = os.stat(path)
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as f:
+            digest.update(f.read(SAMPLE))
+            if stat.st_size > SAMPLE:
+                f.seek(max(SAMPLE, stat.st_size - SAMPLE))
+                digest.update(f.read(SAMPLE))
+        result[os.path.basename(path)] = [
+            stat.st_size, stat.st_mtime_ns, digest.hexdigest()
+        ]
+    return result
+
+
+def write_snapshot(path, sources, buffers, key=None):
+    """
+    Writes a snapshot of `buffers`, a dict mapping names to objects
+    supporting the buffer protocol (arrays, bytes, bytearrays), built
+    from the files in `sources` with the options in `key` (any JSON
+    value).
+
+    The file is written beside `path` and renamed into place, so a
+    reader never sees a half-written snapshot.
+    """
+    layout = {}
+    offset = 0
+    for name, buffer in buffers.items():
+        view = memoryview(buffer)
+        layout[name] = [offset, view.nbytes, view.format]
+        offset += padded(view.nbytes)
+    header = json.dumps({
+        "version": VERSION,
+        "sources": fingerprint(sources),
+        "key": key,
+        "buffers": layout
+    }).encode("utf-8")
+    header += b" " * (padded(len(header)) - len(header))
+
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(len(header).to_bytes(8, "little"))
+        f.write(header)
+        for buffer in buffers.values():
+            view = memoryview(buffer)
+            f.write(view)
+            f.write(bytes(padded(view.nbytes) - view.nbytes))
+    os.replace(tmp, path)
+
+
+def read_snapshot(path, sources, key=None):
+    """
+    Memory-maps a snapshot and returns a dict mapping buffer names to
+    memoryviews cast to their original formats.
+
+    Returns None if there is no snapshot, it is truncated or corrupt,
+    it has another version or `key`, or the files in `sources` changed
+    since it was written.
+    """
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return None
+    with f:
+        # A truncated or corrupt snapshot is as good as none
+        try:
+            if f.read(len(MAGIC)) != MAGIC:
+                return None
+            length = int.from_bytes(f.read(8), "little")
+            header = json.loads(f.read(length))
+            if (header["version"] != VERSION
+                    or header["key"] != key
+                    or header["sources"] != fingerprint(sources)):
+                return None
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+            start = len(MAGIC) + 8 + length
+            view = memoryview(data)
+            buffers = {}
+            for name, (offset, size, format) in header["buffers"].items():
+                offset += start
+                if offset + size > len(data):
+                    return None
+                buffers[name] = view[offset:offset + size].cast(format)
+        except (ValueError, KeyError, TypeError, OSError):
+            return None
+    return buffers
+
+
+def padded(size):
+    """Rounds a size up to a multiple of 8 bytes."""
+    return (size + 7) // 8 * 8
@@ -0,0 +1,110 @@
+"""
+Report statistics about a degrees dataset.
+
+Usage: python stats.py [directory] [--sweeps N]
+
+Prints the numbers of people, movies and stars, the sizes of the
+largest connected components, histograms of movies per person and
+cast sizes, and a lower bound on the diameter of the largest
+component from repeated double-sweep breadth-first searches.
+"""
+import argparse
+import random
+from collections import Counter, deque
+
+import degrees
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--sweeps", type=int, default=4,
+                        help="double sweeps used to estimate the diameter")
+    parser.add_argument("--top", type=int, default=10,
+                        help="number of largest components to list")
+    degrees.add_load_arguments(parser)
+    args = parser.parse_args()
+
+    options = degrees.load_options(args)
+    options["compact"] = True
+    print("Loading data...")
+    stats = degrees.load_data(args.directory, **options)
+    print("Data loaded.")
+    degrees.report_dropped(stats)
+
+    graph = degrees.graph
+    components = degrees.components
+    print(f"People: {len(graph.person_ids)}")
+    print(f"Movies: {len(graph.movie_ids)}")
+    print(f"Stars: {len(graph.person_movies)}")
+
+    sizes = sorted(components.sizes, reverse=True)
+    print(f"Components: {len(sizes)}")
+    print(f"Largest components: {', '.join(map(str, sizes[:args.top]))}")
+    singletons = sum(1 for size in sizes if size == 1)
+    print(f"People with no co-stars: {singletons}")
+
+    print("Movies per person:")
+    print_histogram(differences(graph.person_offsets))
+    print("Cast size per movie:")
+    print_histogram(differences(graph.movie_offsets))
+
+    largest = max(range(len(components.sizes)),
+                  key=components.sizes.__getitem__, default=None)
+    if largest is not None:
+        people = [person for person in range(len(graph.person_ids))
+                  if components.labels[person] == largest]
+        diameter = estimate_diameter(graph, people, args.sweeps)
+        print(f"Diameter of largest component: at least {diameter}")
+
+
+def differences(offsets):
+    """Yields the length of each slice of a CSR offsets array."""
+    for i in range(len(offsets) - 1):
+        yield offsets[i + 1] - offsets[i]
+
+
+def print_histogram(values):
+    """Prints counts of values in power-of-two buckets."""
+    buckets = Counter(value.bit_length() for value in values)
+    for bucket in sorted(buckets):
+        low = 0 if bucket == 0 else 1 << (bucket - 1)
+        high = 0 if bucket == 0 else (1 << bucket) - 1
+        label = f"{low}" if low == high else f"{low}-{high}"
+        print(f"  {label:>11}: {buckets[bucket]}")
+
+
+def estimate_diameter(graph, people, sweeps, seed=0):
+    """
+    Returns a lower bound on the diameter of the component containing
+    `people`: each sweep searches from a random person, then again from
+    the farthest person found, keeping the largest distance seen.
+    """
+    rng = random.Random(seed)
+    best = 0
+    for _ in range(sweeps):
+        farthest, _ = eccentricity(graph, rng.choice(people))
+        _, distance = eccentricity(graph, farthest)
+        best = max(best, distance)
+    return best
+
+
+def eccentricity(graph, source):
+    """
+    Returns the person farthest from `source` (by index) and how far
+    away they are.
+    """
+    distance = {source: 0}
+    queue = deque([source])
+    person = source
+    while queue:
+        person = queue.popleft()
+        for _, neighbor in graph.neighbors(person):
+            if neighbor not in distance:
+                distance[neighbor] = distance[person] + 1
+                queue.append(neighbor)
+    return person, distance[person]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Single-source shortest path trees over a `CompactGraph`.
+
+A tree records, for every person, their distance from one source
+person and the (movie, person) step back towards the source, so any
+path from that source can be read off in O(path length). Trees are
+saved as snapshots under a `trees` directory next to the CSV files.
+"""
+import os
+from array import array
+from collections import deque
+
+from compact import SOURCES
+from snapshot import read_snapshot, write_snapshot
+
+# Directory, next to the CSV files, holding saved trees
+TREES = "trees"
+
+
+class ShortestPathTree():
+
+    def __init__(self, graph, source, distance, parent, movie):
+        self.graph = graph
+        self.source = source
+
+        # Indexed by person: distance from the source (-1 if not
+        # connected), previous person on the path and movie shared
+        self.distance = distance
+        self.parent = parent
+        self.movie = movie
+
+    @classmethod
+    def build(cls, graph, source):
+        """
+        Runs a breadth-first search over the whole graph from the
+        person with IMDB id `source`.
+        """
+        n = len(graph.person_ids)
+        distance = array("i", [-1]) * n
+        parent = array("i", [-1]) * n
+        movie = array("i", [-1]) * n
+
+        start = graph.person_index(source)
+        distance[start] = 0
+        queue = deque([start])
+        while queue:
+            person = queue.popleft()
+            for movie_index, neighbor in graph.neighbors(person):
+                if distance[neighbor] == -1:
+                    distance[neighbor] = distance[person] + 1
+                    parent[neighbor] = person
+                    movie[neighbor] = movie_index
+                    queue.append(neighbor)
+        return cls(graph, source, distance, parent, movie)
+
+    @classmethod
+    def load(cls, graph, directory, source):
+        """
+        Returns the saved tree for `source`, or None if there is none
+        or it is out of date with the CSV files or the graph's filters.
+        """
+        buffers = read_snapshot(tree_path(directory, source),
+                                source_paths(directory), graph.key)
+        if buffers is None:
+            return None
+        return cls(graph, source, buffers["distance"],
+                   buffers["parent"], buffers["movie"])
+
+    def save(self, directory):
+        os.makedirs(f"{directory}/{TREES}", exist_ok=True)
+        write_snapshot(tree_path(directory, self.source),
+                       source_paths(directory), {
+                           "distance": self.distance,
+                           "parent": self.parent,
+                           "movie": self.movie
+                       }, self.graph.key)
+
+    def degrees(self, target):
+        """
+        Returns the number of degrees between the source and the
+        target, or None if they are not connected.
+        """
+        distance = self.distance[self.graph.person_index(target)]
+        return None if distance == -1 else distance
+
+    def path_to(self, target):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect the source to the target.
+
+        If no possible path, returns None.
+        """
+        person = self.graph.person_index(target)
+        if self.distance[person] == -1:
+            return None
+        path = []
+        while self.parent[person] != -1:
+            path.append((self.graph.movie_ids[self.movie[person]],
+                         self.graph.person_ids[person]))
+            person = self.parent[person]
+        path.reverse()
+        return path
+
+
+def load_trees(graph, directory):
+    """
+    Returns a dict mapping source IMDB ids to every up to date tree
+    saved for a directory.
+    """
+    trees = {}
+    if not os.path.isdir(f"{directory}/{TREES}"):
+        return trees
+    for filename in os.listdir(f"{directory}/{TREES}"):
+        if not filename.endswith(".snapshot"):
+            continue
+        source = filename[:-len(".snapshot")]
+        tree = ShortestPathTree.load(graph, directory, source)
+        if tree is not None:
+            trees[source] = tree
+    return trees
+
+
+def reverse_path(source, path):
+    """
+    Reverses a list of (movie_id, person_id) pairs leading away from
+    `source` into one leading back to it.
+    """
+    people = [source] + [person_id for _, person_id in path]
+    return [(path[i][0], people[i]) for i in range(len(path) - 1, -1, -1)]
+
+
+def tree_path(directory, source):
+    return f"{directory}/{TREES}/{source}.snapshot"
+
+
+def source_paths(directory):
+    return [f"{directory}/{source}" for source in SOURCES]
@@ -1,3 +1,6 @@
+from collections import Counter, deque
+
+
 class Node():
     def __init__(self, state, parent, action):
         self.state = state
@@ -7,13 +10,17 @@ class Node():
 
 class StackFrontier():
     def __init__(self):
-        self.frontier = []
+        self.frontier = deque()
+
+        # Number of nodes in the frontier for each state
+        self.states = Counter()
 
     def add(self, node):
         self.frontier.append(node)
+        self.states[node.state] += 1
 
     def contains_state(self, state):
-        return any(node.state == state for node in self.frontier)
+        return state in self.states
 
     def empty(self):
         return len(self.frontier) == 0
@@ -22,10 +29,15 @@ class StackFrontier():
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[-1]
-            self.frontier = self.frontier[:-1]
+            node = self.frontier.pop()
+            self.discard(node.state)
             return node
 
+    def discard(self, state):
+        self.states[state] -= 1
+        if self.states[state] == 0:
+            del self.states[state]
+
 
 class QueueFrontier(StackFrontier):
 
@@ -33,6 +45,121 @@ class QueueFrontier(StackFrontier):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[0]
-            self.frontier = self.frontier[1:]
+            node = self.frontier.popleft()
+            self.discard(node.state)
             return node
+
+
+def bidirectional_search(source, target, neighbors):
+    """
+    Returns the shortest list of (action, state) pairs that connect
+    the source to the target, where `neighbors(state)` gives the
+    (action, state) pairs reachable from a state in one step and
+    every step can also be taken in reverse.
+
+    Runs one breadth-first search from the source and one from the
+    target, always expanding a whole layer of the smaller frontier,
+    and stitches the two halves together where they meet.
+
+    If no possible path, returns None.
+    """
+    if source == target:
+        return []
+
+    # Maps each reached state to the (action, state) step back
+    # towards the side's root (None for the root itself)
+    forward = {source: None}
+    backward = {target: None}
+    forward_frontier = [source]
+    backward_frontier = [target]
+
+    while forward_frontier and backward_frontier:
+
+        # Expand the side with fewer states waiting
+        if len(forward_frontier) <= len(backward_frontier):
+            frontier, visited, other = forward_frontier, forward, backward
+        else:
+            frontier, visited, other = backward_frontier, backward, forward
+
+        next_frontier = []
+        for state in frontier:
+            for action, neighbor in neighbors(state):
+                if neighbor in visited:
+                    continue
+                visited[neighbor] = (action, state)
+                if neighbor in other:
+                    return join_paths(forward, backward, neighbor)
+                next_frontier.append(neighbor)
+
+        if visited is forward:
+            forward_frontier = next_frontier
+        else:
+            backward_frontier = next_frontier
+
+    return None
+
+
+def join_paths(forward, backward, meeting):
+    """
+    Builds a list of (action, state) pairs from the forward search
+    root to the backward search root through `meeting`.
+    """
+    path = []
+    state = meeting
+    while forward[state] is not None:
+        action, parent = forward[state]
+        path.append((action, state))
+        state = parent
+    path.reverse()
+
+    state = meeting
+    while backward[state] is not None:
+        action, child = backward[state]
+        path.append((action, child))
+        state = child
+    return path
+
+
+def all_shortest_paths(source, target, neighbors):
+    """
+    Yields every shortest list of (action, state) pairs that connect
+    the source to the target, where `neighbors(state)` gives the
+    (action, state) pairs reachable from a state in one step.
+
+    One breadth-first search records, for every state up to the
+    target's depth, all the steps reaching it from the layer before;
+    the paths are then enumerated lazily from that layered graph, so
+    taking the first few never builds the rest.
+    """
+    if source == target:
+        yield []
+        return
+
+    # Maps each reached state to the (action, state) steps reaching it
+    # from the previous layer
+    parents = {source: []}
+    layer = [source]
+    while layer and target not in parents:
+        next_layer = {}
+        for state in layer:
+            for action, neighbor in neighbors(state):
+                if neighbor in parents:
+                    continue
+                if neighbor not in next_layer:
+                    next_layer[neighbor] = []
+                next_layer[neighbor].append((action, state))
+        parents.update(next_layer)
+        layer = list(next_layer)
+
+    if target not in parents:
+        return
+
+    # Walk back from the target, keeping the path built so far
+    stack = [(target, [])]
+    while stack:
+        state, suffix = stack.pop()
+        if state == source:
+            yield suffix
+            continue
+        for action, parent in reversed(parents[state]):
+            stack.append((parent, [(action, state)] + suffix))
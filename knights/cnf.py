@@ -0,0 +1,280 @@
+"""
+Compiled forms of logical sentences.
+
+The classes in logic.py stay the way sentences are written; these turn
+them into flat forms over integer symbol indices that are cheaper to
+evaluate and to solve:
+
+    Program    straight-line code, one instruction per distinct
+               subformula, run against bit-packed models
+    CNF        clauses over integer variables (Tseitin encoding), with
+               one extra variable per distinct And, Or, Implication and
+               Biconditional, for satisfiability solvers
+
+A bit-packed model is an int whose bit i is the value of symbol i.
+"""
+import operator
+from functools import reduce
+
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+
+# Program instructions
+SYMBOL, NOT, AND, OR, IMPLIES, IFF = range(6)
+
+# Truth-table chunks hold 2 ** CHUNK_BITS models, one bit each
+CHUNK_BITS = 16
+
+# Chunk size of 64 models, the size of a machine word
+WORD_BITS = 6
+
+
+class Program():
+    """
+    Sentences compiled to straight-line code over symbol indices.
+
+    Each instruction computes one register from symbol bits or earlier
+    registers, and identical subformulas share a register. Registers
+    are ints operated on bitwise, so a run can evaluate one model (bits
+    0 or 1) or many at once (one bit per model, see `run`).
+    """
+
+    def __init__(self, symbols=()):
+        self.symbols = []
+        self.index = {}
+        self.code = []
+        self.registers = {}
+        for symbol in symbols:
+            self.symbol(symbol)
+
+    def symbol(self, name):
+        """Return the index of a symbol name, adding it if new."""
+        if name not in self.index:
+            self.index[name] = len(self.symbols)
+            self.symbols.append(name)
+        return self.index[name]
+
+    def add(self, sentence):
+        """Return the register holding a sentence's value."""
+        if sentence in self.registers:
+            return self.registers[sentence]
+        if isinstance(sentence, Symbol):
+            instruction = (SYMBOL, self.symbol(sentence.name))
+        elif isinstance(sentence, Not):
+            instruction = (NOT, self.add(sentence.operand))
+        elif isinstance(sentence, And):
+            instruction = (AND, tuple(self.add(conjunct)
+                                      for conjunct in sentence.conjuncts))
+        elif isinstance(sentence, Or):
+            instruction = (OR, tuple(self.add(disjunct)
+                                     for disjunct in sentence.disjuncts))
+        elif isinstance(sentence, Implication):
+            instruction = (IMPLIES, self.add(sentence.antecedent),
+                           self.add(sentence.consequent))
+        elif isinstance(sentence, Biconditional):
+            instruction = (IFF, self.add(sentence.left),
+                           self.add(sentence.right))
+        else:
+            raise TypeError("must be a logical sentence")
+        self.code.append(instruction)
+        register = len(self.code) - 1
+        self.registers[sentence] = register
+        return register
+
+    def run(self, columns, ones=1, values=None):
+        """
+        Return the value of every register, given `columns[i]`, the
+        value of symbol i, where `ones` has every bit in use set: 1 for
+        a single model, or (1 << k) - 1 for columns of k models. NumPy
+        arrays of unsigned ints work as columns too.
+
+        `values` from an earlier run on the same columns is extended
+        in place with only the registers added since.
+        """
+        if values is None:
+            values = []
+        for instruction in self.code[len(values):]:
+            op = instruction[0]
+            if op == SYMBOL:
+                value = columns[instruction[1]]
+            elif op == NOT:
+                value = ones ^ values[instruction[1]]
+            elif op == AND:
+                value = reduce(operator.and_,
+                               (values[i] for i in instruction[1]), ones)
+            elif op == OR:
+                value = reduce(operator.or_,
+                               (values[i] for i in instruction[1]),
+                               ones ^ ones)
+            elif op == IMPLIES:
+                value = ones ^ values[instruction[1]]
+                value |= values[instruction[2]]
+            else:
+                value = ones ^ values[instruction[1]]
+                value ^= values[instruction[2]]
+            values.append(value)
+        return values
+
+    def evaluate(self, register, model):
+        """
+        Return the value of a register in a bit-packed model.
+        """
+        columns = [(model >> i) & 1 for i in range(len(self.symbols))]
+        return bool(self.run(columns)[register])
+
+
+class CNF():
+    """
+    Sentences in conjunctive normal form by the Tseitin encoding.
+
+    Variables are numbered from 1, and a literal is a variable or its
+    negation, as in the DIMACS format. Symbols get the first variables
+    they are seen in; every other compound subformula gets a new
+    variable constrained to equal it, so the clauses grow linearly with
+    the sentence and are satisfiable exactly when the sentence is.
+    """
+
+    def __init__(self, symbols=()):
+        self.variables = {}
+        self.names = [None]
+        self.clauses = []
+        self.literals = {}
+        for symbol in symbols:
+            self.variable(symbol)
+
+    def variable(self, name=None):
+        """
+        Return the variable of a symbol name, adding it if new, or a new
+        auxiliary variable if `name` is None.
+        """
+        if name is not None and name in self.variables:
+            return self.variables[name]
+        self.names.append(name)
+        variable = len(self.names) - 1
+        if name is not None:
+            self.variables[name] = variable
+        return variable
+
+    def add(self, sentence):
+        """Adds a sentence as a constraint: its literal must be true."""
+        self.clauses.append((self.literal(sentence),))
+
+    def literal(self, sentence):
+        """Return a literal equal to a sentence, adding its clauses."""
+        if sentence in self.literals:
+            return self.literals[sentence]
+        if isinstance(sentence, Symbol):
+            literal = self.variable(sentence.name)
+        elif isinstance(sentence, Not):
+            literal = -self.literal(sentence.operand)
+        elif isinstance(sentence, (And, Or, Implication)):
+            if isinstance(sentence, And):
+                operands = [self.literal(conjunct)
+                            for conjunct in sentence.conjuncts]
+            elif isinstance(sentence, Or):
+                operands = [self.literal(disjunct)
+                            for disjunct in sentence.disjuncts]
+            else:
+                operands = [-self.literal(sentence.antecedent),
+                            self.literal(sentence.consequent)]
+            literal = self.variable()
+
+            # An Implication is an Or, and an Or is ¬And of negations
+            sign = 1 if isinstance(sentence, And) else -1
+            operands = [sign * operand for operand in operands]
+            self.clauses.append(
+                (sign * literal, *(-operand for operand in operands))
+            )
+            for operand in operands:
+                self.clauses.append((-sign * literal, operand))
+        elif isinstance(sentence, Biconditional):
+            left = self.literal(sentence.left)
+            right = self.literal(sentence.right)
+            literal = self.variable()
+            self.clauses.extend([
+                (-literal, -left, right),
+                (-literal, left, -right),
+                (literal, left, right),
+                (literal, -left, -right)
+            ])
+        else:
+            raise TypeError("must be a logical sentence")
+        self.literals[sentence] = literal
+        return literal
+
+    def masks(self):
+        """
+        Return each clause as a (positive, negative) pair of bit masks
+        of its variables, bit v for variable v.
+        """
+        masks = []
+        for clause in self.clauses:
+            positive = negative = 0
+            for literal in clause:
+                if literal > 0:
+                    positive |= 1 << literal
+                else:
+                    negative |= 1 << -literal
+            masks.append((positive, negative))
+        return masks
+
+    def satisfied(self, model, masks=None):
+        """
+        Return whether a bit-packed assignment of every variable (bit v
+        for variable v) satisfies all clauses.
+        """
+        if masks is None:
+            masks = self.masks()
+        return all(model & positive or ~model & negative
+                   for positive, negative in masks)
+
+
+def compiled_model_check(knowledge, query):
+    """
+    Checks if knowledge base entails query, like `model_check`, running
+    both as one compiled program on a machine word of bit-packed models
+    at a time.
+    """
+    return bitset_model_check(knowledge, query, WORD_BITS)
+
+
+def truth_table(n):
+    """
+    Return (columns, ones) for the truth table of n symbols as ints of
+    2 ** n bits, one per model: symbol i is true in the models whose
+    index has bit i set, and `ones` has every model's bit set.
+    """
+    ones = (1 << (1 << n)) - 1
+
+    # Blocks of 2 ** i zeros then 2 ** i ones, repeated through the
+    # table by multiplying with a 1 every 2 ** (i + 1) bits
+    columns = []
+    for i in range(n):
+        width = 1 << (i + 1)
+        block = ((1 << (1 << i)) - 1) << (1 << i)
+        columns.append(block * (ones // ((1 << width) - 1)))
+    return columns, ones
+
+
+def bitset_model_check(knowledge, query, chunk_bits=CHUNK_BITS):
+    """
+    Checks if knowledge base entails query, like `model_check`, over
+    the truth table in chunks of 2 ** `chunk_bits` models.
+
+    Within a chunk every symbol's column is one int with a bit per
+    model, so each instruction of the compiled program evaluates the
+    whole chunk in one bitwise operation. The first `chunk_bits`
+    symbols vary within a chunk; the rest are constant across it.
+    """
+    program = Program(sorted(knowledge.symbol_set() | query.symbol_set()))
+    knowledge_register = program.add(knowledge)
+    query_register = program.add(query)
+    n = len(program.symbols)
+    k = min(n, chunk_bits)
+    columns, ones = truth_table(k)
+    for chunk in range(1 << (n - k)):
+        values = program.run(columns + [
+            ones if (chunk >> i) & 1 else 0 for i in range(n - k)
+        ], ones)
+        if values[knowledge_register] & (ones ^ values[query_register]):
+            return False
+    return True
@@ -0,0 +1,151 @@
+"""
+Knowledge bases that answer many entailment queries.
+
+`model_check` starts from scratch for every query. A KnowledgeBase
+compiles its sentences once, as they are added, and keeps what it has
+worked out between queries:
+
+    "sat"       one incremental solver over the Tseitin clauses of all
+                sentences and queries, keeping every learned clause,
+                plus the models it has found, which settle later
+                queries they falsify without solving again
+    "bitset"    the set of satisfying models as one int with a bit per
+                row of the truth table, narrowed by each added sentence
+                and extended by each new symbol
+
+A truth table of n symbols takes 2 ** n bits per symbol and per
+subformula, so a "bitset" knowledge base switches to "sat" once it
+has more than MAX_BITSET_SYMBOLS symbols, replaying its sentences.
+"""
+from cnf import CHUNK_BITS, CNF, Program, truth_table
+from sat import Solver
+
+METHODS = ["sat", "bitset"]
+
+# Most symbols in a "bitset" truth table: one chunk of bitset_model_check
+MAX_BITSET_SYMBOLS = CHUNK_BITS
+
+
+class KnowledgeBase():
+    """
+    A conjunction of sentences that can be added to and queried.
+    """
+
+    def __init__(self, *sentences, method="sat"):
+        if method not in METHODS:
+            raise ValueError(f"unknown method: {method}")
+        self.method = method
+        self.sentences = []
+
+        # "sat" state
+        self.cnf = CNF()
+        self.solver = Solver()
+        self.fed = 0
+        self.models = []
+
+        # "bitset" state
+        self.program = Program()
+        self.table = 1
+        self.columns, self.ones = truth_table(0)
+        self.values = []
+
+        for sentence in sentences:
+            self.add(sentence)
+
+    def add(self, sentence):
+        """Adds a sentence to the knowledge base."""
+        if self.method == "bitset":
+            self.extend(sentence.symbol_set())
+        self.sentences.append(sentence)
+        if self.method == "sat":
+            self.cnf.add(sentence)
+            self.feed()
+            self.models = [model for model in self.models
+                           if holds(sentence, model)]
+        else:
+            register = self.program.add(sentence)
+            self.table &= self.column(register)
+
+    def entails(self, query):
+        """Checks if the knowledge base entails query."""
+        if self.method == "bitset":
+            self.extend(query.symbol_set())
+        if self.method == "sat":
+            if any(holds(query, model) is False for model in self.models):
+                return False
+            literal = self.cnf.literal(query)
+            self.feed()
+            model = self.solver.solve([-literal])
+            if model is None:
+                return True
+            self.models.append({name: model[variable] for name, variable
+                                in self.cnf.variables.items()})
+            return False
+        register = self.program.add(query)
+        return not self.table & (self.ones ^ self.column(register))
+
+    def entails_all(self, queries):
+        """Return, for each query, whether the knowledge base entails it."""
+        return [self.entails(query) for query in queries]
+
+    def satisfiable(self):
+        """Checks if the knowledge base has any model."""
+        if self.method == "sat":
+            return bool(self.models) or self.solver.solve() is not None
+        return self.table != 0
+
+    def feed(self):
+        """Passes clauses added to the CNF since last time to the solver."""
+        for clause in self.cnf.clauses[self.fed:]:
+            self.solver.add_clause(clause)
+        self.fed = len(self.cnf.clauses)
+
+    def extend(self, symbols):
+        """
+        Adds new symbols to the truth table. Each one doubles it, with
+        the symbol false in the old half and true in the new, and the
+        set of models doubles with it, as nothing constrains the symbol.
+
+        Switches to "sat" instead if the table would have more than
+        MAX_BITSET_SYMBOLS symbols.
+        """
+        new = sorted(symbols - self.program.index.keys())
+        if not new:
+            return
+        if len(self.program.symbols) + len(new) > MAX_BITSET_SYMBOLS:
+            self.fall_back()
+            return
+        for name in new:
+            self.table |= self.table << (1 << len(self.program.symbols))
+            self.program.symbol(name)
+        self.columns, self.ones = truth_table(len(self.program.symbols))
+        self.values = []
+
+    def fall_back(self):
+        """
+        Switches to "sat", adding the sentences so far to the solver,
+        and frees the truth table.
+        """
+        self.method = "sat"
+        for sentence in self.sentences:
+            self.cnf.add(sentence)
+        self.feed()
+        self.program = Program()
+        self.table = 1
+        self.columns, self.ones = truth_table(0)
+        self.values = []
+
+    def column(self, register):
+        """Return a register's value in every row of the truth table."""
+        self.program.run(self.columns, self.ones, self.values)
+        return self.values[register]
+
+
+def holds(sentence, model):
+    """
+    Return whether a sentence is true in a model of symbol values, or
+    None if the model lacks any of its symbols.
+    """
+    if not sentence.symbol_set() <= model.keys():
+        return None
+    return sentence.evaluate(model)
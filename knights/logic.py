@@ -1,7 +1,32 @@
 import itertools
+import weakref
+
+# Ways model_check can decide entailment
+METHODS = ["enumerate", "compiled", "bitset", "sat"]
 
 
 class Sentence():
+    """
+    Sentences other than And are immutable and hash-consed: building a
+    sentence equal to one that already exists returns that same object,
+    so identical subformulas are shared, and equal sentences compare by
+    identity first. Hashes and symbol sets are computed once per node.
+
+    And can change (see `And.add`), so a sentence with an And anywhere
+    in it is neither shared nor cached, and always reflects the And's
+    current conjuncts.
+    """
+
+    __slots__ = ("_hash", "_symbols", "_shared", "__weakref__")
+
+    # Hash-consed sentences by class and the identities of their parts
+    _interned = weakref.WeakValueDictionary()
+
+    def __reduce__(self):
+        # Only the parts are pickled, never the cached hash or symbols:
+        # string hashes differ between processes, and unpickling an
+        # existing shared sentence would overwrite its hash in use
+        return (type(self), self.__getnewargs__())
 
     def evaluate(self, model):
         """Evaluates the logical sentence."""
@@ -15,11 +40,44 @@ class Sentence():
         """Returns a set of all symbols in the logical sentence."""
         return set()
 
+    def symbol_set(self):
+        """Returns a frozenset of all symbols, cached by each node."""
+        return frozenset(self.symbols())
+
     @classmethod
     def validate(cls, sentence):
         if not isinstance(sentence, Sentence):
             raise TypeError("must be a logical sentence")
 
+    @classmethod
+    def intern(cls, key, parts=(), **fields):
+        """
+        Returns the sentence of class `cls` stored under `key`, or a new
+        one with the given fields if there is none. A new sentence is
+        only stored if none of its `parts` contains an And.
+        """
+        shared = all(part._shared for part in parts)
+        sentence = Sentence._interned.get(key) if shared else None
+        if sentence is None:
+            sentence = object.__new__(cls)
+            sentence._hash = None
+            sentence._symbols = None
+            sentence._shared = shared
+            for field, value in fields.items():
+                setattr(sentence, field, value)
+            if shared:
+                Sentence._interned[key] = sentence
+        return sentence
+
+    def cache(self, field, value):
+        """
+        Stores a computed hash or symbol set in `field`, unless an And
+        in the sentence could change it, and returns it.
+        """
+        if self._shared:
+            setattr(self, field, value)
+        return value
+
     @classmethod
     def parenthesize(cls, s):
         """Parenthesizes an expression if not already parenthesized."""
@@ -43,15 +101,23 @@ class Sentence():
 
 
 class Symbol(Sentence):
+    __slots__ = ("name",)
+
+    def __new__(cls, name):
+        return cls.intern((cls, name), name=name)
 
-    def __init__(self, name):
-        self.name = name
+    def __getnewargs__(self):
+        return (self.name,)
 
     def __eq__(self, other):
-        return isinstance(other, Symbol) and self.name == other.name
+        return self is other or (
+            isinstance(other, Symbol) and self.name == other.name
+        )
 
     def __hash__(self):
-        return hash(("symbol", self.name))
+        if self._hash is None:
+            self._hash = hash(("symbol", self.name))
+        return self._hash
 
     def __repr__(self):
         return self.name
@@ -68,17 +134,31 @@ class Symbol(Sentence):
     def symbols(self):
         return {self.name}
 
+    def symbol_set(self):
+        if self._symbols is None:
+            self._symbols = frozenset((self.name,))
+        return self._symbols
+
 
 class Not(Sentence):
-    def __init__(self, operand):
+    __slots__ = ("operand",)
+
+    def __new__(cls, operand):
         Sentence.validate(operand)
-        self.operand = operand
+        return cls.intern((cls, id(operand)), (operand,), operand=operand)
+
+    def __getnewargs__(self):
+        return (self.operand,)
 
     def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
+        return self is other or (
+            isinstance(other, Not) and self.operand == other.operand
+        )
 
     def __hash__(self):
-        return hash(("not", hash(self.operand)))
+        if self._hash is None:
+            return self.cache("_hash", hash(("not", hash(self.operand))))
+        return self._hash
 
     def __repr__(self):
         return f"Not({self.operand})"
@@ -90,22 +170,44 @@ class Not(Sentence):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
     def symbols(self):
-        return self.operand.symbols()
+        return set(self.symbol_set())
+
+    def symbol_set(self):
+        if self._symbols is None:
+            return self.cache("_symbols", self.operand.symbol_set())
+        return self._symbols
 
 
 class And(Sentence):
+    """
+    And is not hash-consed, since `add` changes it in place, and it
+    only caches its hash and symbols while its conjuncts have no And.
+    """
+
+    __slots__ = ("conjuncts",)
+
     def __init__(self, *conjuncts):
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
         self.conjuncts = list(conjuncts)
+        self._hash = None
+        self._symbols = None
+        self._shared = False
+
+    def __getnewargs__(self):
+        return tuple(self.conjuncts)
 
     def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
+        return self is other or (
+            isinstance(other, And) and self.conjuncts == other.conjuncts
+        )
 
     def __hash__(self):
-        return hash(
-            ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
-        )
+        if self._hash is None:
+            return self.cache("_hash", hash(
+                ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
+            ))
+        return self._hash
 
     def __repr__(self):
         conjunctions = ", ".join(
@@ -113,9 +215,17 @@ class And(Sentence):
         )
         return f"And({conjunctions})"
 
+    def cache(self, field, value):
+        # `add` clears the cache, so only a changing conjunct can stale it
+        if all(conjunct._shared for conjunct in self.conjuncts):
+            setattr(self, field, value)
+        return value
+
     def add(self, conjunct):
         Sentence.validate(conjunct)
         self.conjuncts.append(conjunct)
+        self._hash = None
+        self._symbols = None
 
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
@@ -127,22 +237,39 @@ class And(Sentence):
                            for conjunct in self.conjuncts])
 
     def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+        return set(self.symbol_set())
+
+    def symbol_set(self):
+        if self._symbols is None:
+            return self.cache("_symbols", frozenset().union(
+                *[conjunct.symbol_set() for conjunct in self.conjuncts]
+            ))
+        return self._symbols
 
 
 class Or(Sentence):
-    def __init__(self, *disjuncts):
+    __slots__ = ("disjuncts",)
+
+    def __new__(cls, *disjuncts):
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
-        self.disjuncts = list(disjuncts)
+        return cls.intern((cls, *map(id, disjuncts)), disjuncts,
+                          disjuncts=list(disjuncts))
+
+    def __getnewargs__(self):
+        return tuple(self.disjuncts)
 
     def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
+        return self is other or (
+            isinstance(other, Or) and self.disjuncts == other.disjuncts
+        )
 
     def __hash__(self):
-        return hash(
-            ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
-        )
+        if self._hash is None:
+            return self.cache("_hash", hash(
+                ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
+            ))
+        return self._hash
 
     def __repr__(self):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
@@ -158,23 +285,39 @@ class Or(Sentence):
                             for disjunct in self.disjuncts])
 
     def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+        return set(self.symbol_set())
+
+    def symbol_set(self):
+        if self._symbols is None:
+            return self.cache("_symbols", frozenset().union(
+                *[disjunct.symbol_set() for disjunct in self.disjuncts]
+            ))
+        return self._symbols
 
 
 class Implication(Sentence):
-    def __init__(self, antecedent, consequent):
+    __slots__ = ("antecedent", "consequent")
+
+    def __new__(cls, antecedent, consequent):
         Sentence.validate(antecedent)
         Sentence.validate(consequent)
-        self.antecedent = antecedent
-        self.consequent = consequent
+        return cls.intern((cls, id(antecedent), id(consequent)),
+                          (antecedent, consequent),
+                          antecedent=antecedent, consequent=consequent)
+
+    def __getnewargs__(self):
+        return (self.antecedent, self.consequent)
 
     def __eq__(self, other):
-        return (isinstance(other, Implication)
-                and self.antecedent == other.antecedent
-                and self.consequent == other.consequent)
+        return self is other or (isinstance(other, Implication)
+                                 and self.antecedent == other.antecedent
+                                 and self.consequent == other.consequent)
 
     def __hash__(self):
-        return hash(("implies", hash(self.antecedent), hash(self.consequent)))
+        if self._hash is None:
+            return self.cache("_hash", hash(("implies", hash(self.antecedent),
+                                             hash(self.consequent))))
+        return self._hash
 
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
@@ -189,23 +332,37 @@ class Implication(Sentence):
         return f"{antecedent} => {consequent}"
 
     def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
+        return set(self.symbol_set())
+
+    def symbol_set(self):
+        if self._symbols is None:
+            return self.cache("_symbols", self.antecedent.symbol_set()
+                              | self.consequent.symbol_set())
+        return self._symbols
 
 
 class Biconditional(Sentence):
-    def __init__(self, left, right):
+    __slots__ = ("left", "right")
+
+    def __new__(cls, left, right):
         Sentence.validate(left)
         Sentence.validate(right)
-        self.left = left
-        self.right = right
+        return cls.intern((cls, id(left), id(right)), (left, right),
+                          left=left, right=right)
+
+    def __getnewargs__(self):
+        return (self.left, self.right)
 
     def __eq__(self, other):
-        return (isinstance(other, Biconditional)
-                and self.left == other.left
-                and self.right == other.right)
+        return self is other or (isinstance(other, Biconditional)
+                                 and self.left == other.left
+                                 and self.right == other.right)
 
     def __hash__(self):
-        return hash(("biconditional", hash(self.left), hash(self.right)))
+        if self._hash is None:
+            return self.cache("_hash", hash(("biconditional", hash(self.left),
+                                             hash(self.right))))
+        return self._hash
 
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
@@ -222,11 +379,38 @@ class Biconditional(Sentence):
         return f"{left} <=> {right}"
 
     def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
-
-
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
+        return set(self.symbol_set())
+
+    def symbol_set(self):
+        if self._symbols is None:
+            return self.cache("_symbols", self.left.symbol_set()
+                              | self.right.symbol_set())
+        return self._symbols
+
+
+def model_check(knowledge, query, method="enumerate"):
+    """
+    Checks if knowledge base entails query.
+
+    `method` is one of METHODS: "enumerate" checks every model by
+    recursion over the sentence objects, "compiled" checks 64 models at
+    a time with the sentences compiled once by cnf.Program, "bitset"
+    runs that program on 65536 models at once, as bits of Python ints,
+    and "sat" shows that knowledge ∧ ¬query has no model with the CDCL
+    solver in sat.py, which scales to knowledge bases far too large to
+    enumerate.
+    """
+    if method not in METHODS:
+        raise ValueError(f"unknown method: {method}")
+    if method == "compiled":
+        from cnf import compiled_model_check
+        return compiled_model_check(knowledge, query)
+    if method == "bitset":
+        from cnf import bitset_model_check
+        return bitset_model_check(knowledge, query)
+    if method == "sat":
+        from sat import sat_model_check
+        return sat_model_check(knowledge, query)
 
     def check_all(knowledge, query, symbols, model):
         """Checks if knowledge base entails query, given a particular model."""
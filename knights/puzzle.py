@@ -1,4 +1,5 @@
 from logic import *
+from knowledge import KnowledgeBase
 
 AKnight = Symbol("A is a Knight")
 AKnave = Symbol("A is a Knave")
@@ -102,8 +103,9 @@ def main():
         if len(knowledge.conjuncts) == 0:
             print("    Not yet implemented.")
         else:
-            for symbol in symbols:
-                if model_check(knowledge, symbol):
+            kb = KnowledgeBase(knowledge)
+            for symbol, entailed in zip(symbols, kb.entails_all(symbols)):
+                if entailed:
                     print(f"    {symbol}")
 
 
@@ -0,0 +1,271 @@
+"""
+A conflict-driven clause learning (CDCL) SAT solver.
+
+The solver extends DPLL search, which assigns one variable at a time
+and propagates unit clauses, with:
+
+    watched literals     each clause watches two of its literals and is
+                         only visited when one of them becomes false
+    clause learning      every conflict is analyzed back to its first
+                         unique implication point, and the learned
+                         clause is kept so that conflict never recurs
+    backjumping          search resumes at the level where the learned
+                         clause becomes unit, not the previous decision
+    activity             variables in recent conflicts are decided
+                         first, with their last value (phase saving)
+
+Clauses use DIMACS-style integer literals, as made by cnf.CNF. Clauses
+can be added between calls to `solve`, and `solve` takes assumptions,
+so one solver answers many related questions and keeps what it learned.
+"""
+from cnf import CNF
+
+# Factor by which conflict activity bumps grow after each conflict
+ACTIVITY_GROWTH = 1 / 0.95
+
+
+class Solver():
+    """
+    Incremental CDCL satisfiability solver over integer literals.
+    """
+
+    def __init__(self, clauses=()):
+        self.clauses = []
+        self.watches = {}
+        self.values = [None]
+        self.levels = [0]
+        self.reasons = [None]
+        self.activity = [0.0]
+        self.phases = [False]
+        self.trail = []
+        self.limits = []
+        self.head = 0
+        self.bump = 1.0
+        self.unsatisfiable = False
+        for clause in clauses:
+            self.add_clause(clause)
+
+    def grow(self, variable):
+        """Makes room for variables up to `variable`."""
+        while len(self.values) <= variable:
+            self.values.append(None)
+            self.levels.append(0)
+            self.reasons.append(None)
+            self.activity.append(0.0)
+            self.phases.append(False)
+            self.watches[len(self.values) - 1] = []
+            self.watches[1 - len(self.values)] = []
+
+    def value(self, literal):
+        """Return whether a literal is true, false or (None) unassigned."""
+        value = self.values[abs(literal)]
+        if value is None or literal > 0:
+            return value
+        return not value
+
+    def add_clause(self, clause):
+        """
+        Adds a clause, simplified by the facts known without any
+        decisions. Return False if the clauses are now unsatisfiable.
+        """
+        self.backtrack(0)
+        literals = list(dict.fromkeys(clause))
+        for literal in literals:
+            self.grow(abs(literal))
+        if any(-literal in literals or self.value(literal)
+               for literal in literals):
+            return not self.unsatisfiable
+        literals = [literal for literal in literals
+                    if self.value(literal) is None]
+        if not literals:
+            self.unsatisfiable = True
+        elif len(literals) == 1:
+            self.assign(literals[0], None)
+            if self.propagate() is not None:
+                self.unsatisfiable = True
+        else:
+            self.attach(literals)
+        return not self.unsatisfiable
+
+    def attach(self, literals):
+        """Stores a clause, watching its first two literals."""
+        self.clauses.append(literals)
+        self.watches[literals[0]].append(len(self.clauses) - 1)
+        self.watches[literals[1]].append(len(self.clauses) - 1)
+        return len(self.clauses) - 1
+
+    def assign(self, literal, reason):
+        """Makes a literal true at the current level."""
+        variable = abs(literal)
+        self.values[variable] = literal > 0
+        self.levels[variable] = len(self.limits)
+        self.reasons[variable] = reason
+        self.trail.append(literal)
+
+    def backtrack(self, level):
+        """Undoes every assignment above decision level `level`."""
+        if len(self.limits) <= level:
+            return
+        for literal in self.trail[self.limits[level]:]:
+            variable = abs(literal)
+            self.phases[variable] = literal > 0
+            self.values[variable] = None
+            self.reasons[variable] = None
+        del self.trail[self.limits[level]:]
+        del self.limits[level:]
+        self.head = len(self.trail)
+
+    def propagate(self):
+        """
+        Assigns every literal implied by unit clauses. Return the index
+        of a clause with every literal false, or None.
+
+        The implied literal of a clause is always moved to its front,
+        so a reason clause's first literal is the one it implied.
+        """
+        while self.head < len(self.trail):
+            false = -self.trail[self.head]
+            self.head += 1
+            watching = self.watches[false]
+            self.watches[false] = kept = []
+            for i, index in enumerate(watching):
+                clause = self.clauses[index]
+                if clause[0] == false:
+                    clause[0], clause[1] = clause[1], clause[0]
+                if self.value(clause[0]):
+                    kept.append(index)
+                    continue
+
+                # Watch another literal that is not false, if any
+                for k in range(2, len(clause)):
+                    if self.value(clause[k]) is not False:
+                        clause[1], clause[k] = clause[k], clause[1]
+                        self.watches[clause[1]].append(index)
+                        break
+                else:
+                    kept.append(index)
+                    if self.value(clause[0]) is False:
+                        kept.extend(watching[i + 1:])
+                        return index
+                    self.assign(clause[0], index)
+        return None
+
+    def analyze(self, conflict):
+        """
+        Return (clause, level): the clause learned from a conflict, cut
+        at the first unique implication point, and the level to jump
+        back to, where that clause has exactly one unassigned literal.
+        """
+        level = len(self.limits)
+        learned = [None]
+        seen = set()
+        pending = 0
+        literal = None
+        index = len(self.trail) - 1
+        clause = self.clauses[conflict]
+        while True:
+            for other in (clause if literal is None else clause[1:]):
+                variable = abs(other)
+                if variable in seen or self.levels[variable] == 0:
+                    continue
+                seen.add(variable)
+                self.activity[variable] += self.bump
+                if self.levels[variable] == level:
+                    pending += 1
+                else:
+                    learned.append(other)
+
+            # Resolve on the latest assigned literal in the conflict
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.clauses[self.reasons[abs(literal)]]
+        learned[0] = -literal
+
+        self.bump *= ACTIVITY_GROWTH
+        if self.bump > 1e100:
+            self.activity = [activity * 1e-100 for activity in self.activity]
+            self.bump *= 1e-100
+
+        if len(learned) == 1:
+            return learned, 0
+        deepest = max(range(1, len(learned)),
+                      key=lambda i: self.levels[abs(learned[i])])
+        learned[1], learned[deepest] = learned[deepest], learned[1]
+        return learned, self.levels[abs(learned[1])]
+
+    def decide(self):
+        """
+        Return the unassigned variable of highest activity, as a
+        literal with its saved phase, or None if all are assigned.
+        """
+        best = None
+        for variable in range(1, len(self.values)):
+            if self.values[variable] is None and (
+                best is None or self.activity[variable] > self.activity[best]
+            ):
+                best = variable
+        if best is None:
+            return None
+        return best if self.phases[best] else -best
+
+    def solve(self, assumptions=()):
+        """
+        Return a satisfying assignment, as a list of values indexed by
+        variable, in which every literal in `assumptions` is true, or
+        None if there is none.
+        """
+        if self.unsatisfiable:
+            return None
+        for literal in assumptions:
+            self.grow(abs(literal))
+        self.backtrack(0)
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                if not self.limits:
+                    self.unsatisfiable = True
+                    return None
+                learned, level = self.analyze(conflict)
+                self.backtrack(level)
+                if len(learned) == 1:
+                    self.assign(learned[0], None)
+                else:
+                    self.assign(learned[0], self.attach(learned))
+                continue
+
+            # Assumptions are decided first, one per level
+            level = len(self.limits)
+            if level < len(assumptions):
+                literal = assumptions[level]
+                if self.value(literal) is False:
+                    self.backtrack(0)
+                    return None
+                self.limits.append(len(self.trail))
+                if self.value(literal) is None:
+                    self.assign(literal, None)
+                continue
+
+            literal = self.decide()
+            if literal is None:
+                model = list(self.values)
+                self.backtrack(0)
+                return model
+            self.limits.append(len(self.trail))
+            self.assign(literal, None)
+
+
+def sat_model_check(knowledge, query):
+    """
+    Checks if knowledge base entails query, like `model_check`, by
+    showing that knowledge ∧ ¬query is unsatisfiable.
+    """
+    cnf = CNF()
+    cnf.add(knowledge)
+    literal = cnf.literal(query)
+    solver = Solver(cnf.clauses)
+    return solver.solve([-literal]) is None
@@ -0,0 +1,48 @@
+import unittest
+
+from knowledge import MAX_BITSET_SYMBOLS, KnowledgeBase
+from logic import And, Implication, Not, Or, Symbol
+
+chain = [Symbol(f"s{i}") for i in range(MAX_BITSET_SYMBOLS + 8)]
+
+
+class TestKnowledgeBase(unittest.TestCase):
+
+    def test_methods_agree(self):
+        a, b, c = chain[:3]
+        for method in ["sat", "bitset"]:
+            with self.subTest(method=method):
+                kb = KnowledgeBase(Or(a, b), Not(b), method=method)
+                self.assertEqual(kb.entails_all([a, b, Or(a, c)]),
+                                 [True, False, True])
+                kb.add(Implication(a, c))
+                self.assertTrue(kb.entails(c))
+                kb.add(Not(c))
+                self.assertFalse(kb.satisfiable())
+
+    def test_bitset_falls_back_to_sat(self):
+        kb = KnowledgeBase(chain[0], method="bitset")
+        for before, after in zip(chain, chain[1:MAX_BITSET_SYMBOLS]):
+            kb.add(Implication(before, after))
+        self.assertEqual(kb.method, "bitset")
+        self.assertEqual(len(kb.program.symbols), MAX_BITSET_SYMBOLS)
+
+        for before, after in zip(chain[MAX_BITSET_SYMBOLS - 1:],
+                                 chain[MAX_BITSET_SYMBOLS:]):
+            kb.add(Implication(before, after))
+        self.assertEqual(kb.method, "sat")
+        self.assertEqual(kb.table, 1)
+        self.assertTrue(kb.entails(chain[-1]))
+        self.assertFalse(kb.entails(Not(chain[-1])))
+        self.assertTrue(kb.satisfiable())
+
+    def test_query_symbols_fall_back(self):
+        kb = KnowledgeBase(And(*chain[:MAX_BITSET_SYMBOLS]), method="bitset")
+        self.assertEqual(kb.method, "bitset")
+        self.assertFalse(kb.entails(Or(*chain[MAX_BITSET_SYMBOLS:])))
+        self.assertEqual(kb.method, "sat")
+        self.assertTrue(kb.entails(chain[0]))
+
+
+if __name__ == "__main__":
+    unittest.main()
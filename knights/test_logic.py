@@ -0,0 +1,95 @@
+import os
+import pickle
+import subprocess
+import sys
+import unittest
+
+from logic import And, Biconditional, Implication, Not, Or, Symbol, model_check
+
+a = Symbol("a")
+b = Symbol("b")
+c = Symbol("c")
+
+
+class TestSharing(unittest.TestCase):
+
+    def test_equal_sentences_are_shared(self):
+        self.assertIs(Symbol("a"), a)
+        self.assertIs(Or(a, Not(b)), Or(a, Not(b)))
+        self.assertIs(Implication(a, b), Implication(a, b))
+        self.assertIs(Biconditional(a, b), Biconditional(a, b))
+
+    def test_sentences_with_and_are_not_shared(self):
+        self.assertIsNot(Not(And(a, b)), Not(And(a, b)))
+        self.assertEqual(Not(And(a, b)), Not(And(a, b)))
+
+    def test_pickle_keeps_sharing(self):
+        self.assertIs(pickle.loads(pickle.dumps(Or(a, b))), Or(a, b))
+        self.assertEqual(pickle.loads(pickle.dumps(And(a, Or(b, c)))),
+                         And(a, Or(b, c)))
+
+    def test_pickle_from_another_process(self):
+        def run(seed, code, data=None):
+            return subprocess.run(
+                [sys.executable, "-c", code], input=data,
+                capture_output=True, check=True,
+                cwd=os.path.dirname(os.path.abspath(__file__)),
+                env={**os.environ, "PYTHONHASHSEED": seed}
+            ).stdout
+
+        data = run("1", "import pickle, sys\n"
+                        "from logic import Or, Symbol\n"
+                        "a, b = Symbol('a'), Symbol('b')\n"
+                        "hash(Or(a, b))\n"
+                        "sys.stdout.buffer.write(pickle.dumps(Or(a, b)))")
+        output = run("2", "import pickle, sys\n"
+                          "from logic import Or, Symbol\n"
+                          "a = Symbol('a')\n"
+                          "keys = {a: 1}\n"
+                          "loaded = pickle.load(sys.stdin.buffer)\n"
+                          "print(a in keys, loaded == Or(a, Symbol('b')))",
+                     data)
+        self.assertEqual(output.split(), [b"True", b"True"])
+
+
+class TestMutation(unittest.TestCase):
+
+    def test_rebuild_after_add(self):
+        knowledge = And(a)
+        sentence = Or(knowledge, c)
+        self.assertEqual(sentence.symbols(), {"a", "c"})
+        knowledge.add(b)
+        rebuilt = Or(knowledge, c)
+        self.assertEqual(rebuilt.symbols(), {"a", "b", "c"})
+        self.assertTrue(model_check(rebuilt, Or(a, c)))
+
+    def test_parent_sees_add(self):
+        knowledge = And(a)
+        sentence = Not(Implication(c, knowledge))
+        self.assertEqual(sentence.symbols(), {"a", "c"})
+        before = hash(sentence)
+        knowledge.add(b)
+        self.assertEqual(sentence.symbols(), {"a", "b", "c"})
+        self.assertNotEqual(hash(sentence), before)
+        self.assertEqual(sentence, Not(Implication(c, And(a, b))))
+
+    def test_nested_and_sees_add(self):
+        inner = And(a)
+        outer = And(inner, c)
+        self.assertEqual(outer.symbols(), {"a", "c"})
+        inner.add(b)
+        self.assertEqual(outer.symbols(), {"a", "b", "c"})
+
+    def test_methods_agree_after_add(self):
+        knowledge = And(Or(a, b))
+        query = Implication(Not(a), b)
+        knowledge.add(Not(b))
+        for method in ["enumerate", "compiled", "bitset", "sat"]:
+            with self.subTest(method=method):
+                self.assertTrue(model_check(knowledge, a, method=method))
+                self.assertTrue(model_check(knowledge, query, method=method))
+                self.assertFalse(model_check(knowledge, b, method=method))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,186 @@
+"""
+Benchmark PageRank engines on synthetic HTML corpora.
+
+Usage: python benchmark.py [--pages N] [--samples N] [--engines ...] ...
+
+Generates a directory of HTML pages (or uses an existing corpus), runs
+each engine on it in its own process, and prints one JSON object with,
+per engine, the crawl and rank times, iterations taken, peak memory and
+the L1 distance of its ranks from reference ranks iterated to 1e-10.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import resource
+import tempfile
+import time
+from itertools import accumulate
+
+import pagerank
+from crawler import write_edge_list
+from outofcore import outofcore_pagerank, sort_by_destination
+from sampler import vectorized_sample_pagerank
+from sparse import sparse_pagerank
+
+# Tolerance of the reference ranks engines are compared against
+REFERENCE_TOLERANCE = 1e-10
+
+ENGINES = ["sample", "vectorized", "iterate", "gauss-seidel", "sparse",
+           "outofcore"]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus",
+                        help="benchmark an existing corpus instead")
+    parser.add_argument("--output",
+                        help="write generated pages here and keep them")
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--link-exponent", type=float, default=2.0,
+                        help="power-law exponent of links per page")
+    parser.add_argument("--max-links", type=int, default=100,
+                        help="most links on any page")
+    parser.add_argument("--popularity-exponent", type=float, default=1.0,
+                        help="Zipf exponent of how often pages are linked to")
+    parser.add_argument("--dangling", type=float, default=0.1,
+                        help="fraction of pages with no links")
+    parser.add_argument("--samples", type=int, default=pagerank.SAMPLES)
+    parser.add_argument("--tolerance", type=float, default=0.001)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--engines", default=",".join(ENGINES),
+                        help="comma-separated engines to run")
+    args = parser.parse_args()
+
+    config = vars(args).copy()
+    if args.corpus:
+        results = run_all(args.corpus, args)
+    elif args.output:
+        os.makedirs(args.output, exist_ok=True)
+        generate(args.output, args.pages, args.link_exponent, args.max_links,
+                 args.popularity_exponent, args.dangling, args.seed)
+        results = run_all(args.output, args)
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            generate(directory, args.pages, args.link_exponent,
+                     args.max_links, args.popularity_exponent, args.dangling,
+                     args.seed)
+            results = run_all(directory, args)
+    print(json.dumps({"config": config, "engines": results}, indent=2))
+
+
+def generate(directory, pages, link_exponent=2.0, max_links=100,
+             popularity_exponent=1.0, dangling=0.1, seed=0):
+    """
+    Writes `pages` synthetic HTML pages, page0.html, page1.html, ...
+
+    A `dangling` fraction of pages have no links. The number of links
+    on every other page follows a power law with exponent
+    `link_exponent`, up to `max_links`, and each link goes to page i
+    with probability proportional to 1 / (i + 1) ** `popularity_exponent`,
+    so a few pages are linked to from most pages, as on the web.
+    """
+    rng = random.Random(seed)
+    weights = list(accumulate(1 / (i + 1) ** popularity_exponent
+                              for i in range(pages)))
+    for page in range(pages):
+        links = set()
+        if rng.random() >= dangling:
+            size = min(pages - 1, max_links,
+                       int(rng.paretovariate(link_exponent - 1)))
+            while len(links) < size:
+                link = rng.choices(range(pages), cum_weights=weights)[0]
+                if link != page:
+                    links.add(link)
+        with open(os.path.join(directory, f"page{page}.html"), "w",
+                  encoding="utf-8") as f:
+            f.write(f"<!DOCTYPE html>\n<html>\n<head>\n"
+                    f"<title>Page {page}</title>\n</head>\n<body>\n")
+            for link in sorted(links):
+                f.write(f'<a href="page{link}.html">Page {link}</a>\n')
+            f.write("</body>\n</html>\n")
+
+
+def run_all(directory, args):
+    """
+    Computes reference ranks, then runs every requested engine in a
+    fresh process, so that peak memory is not shared, and returns their
+    results by name.
+    """
+    reference = sparse_pagerank(pagerank.crawl(directory), pagerank.DAMPING,
+                                REFERENCE_TOLERANCE)
+    context = multiprocessing.get_context("fork")
+    results = {}
+    for engine in args.engines.split(","):
+        if engine not in ENGINES:
+            raise ValueError(f"unknown engine: {engine}")
+        with context.Pool(1) as pool:
+            results[engine] = pool.apply(run_engine, (
+                directory, engine, reference, args.samples, args.tolerance,
+                args.seed
+            ))
+    return results
+
+
+def run_engine(directory, engine, reference, samples, tolerance, seed):
+    """
+    Crawls a corpus and ranks it with one engine.
+    """
+    start = time.perf_counter()
+    corpus = pagerank.crawl(directory)
+    crawl_time = time.perf_counter() - start
+
+    iterations = [0]
+
+    def count(iteration, residual):
+        iterations[0] = iteration
+
+    random.seed(seed)
+    start = time.perf_counter()
+    if engine == "sample":
+        ranks = pagerank.sample_pagerank(corpus, pagerank.DAMPING, samples)
+    elif engine == "vectorized":
+        ranks = vectorized_sample_pagerank(corpus, pagerank.DAMPING, samples,
+                                           seed=seed)
+    elif engine == "sparse":
+        ranks = sparse_pagerank(corpus, pagerank.DAMPING, tolerance,
+                                callback=count)
+    elif engine == "outofcore":
+        ranks = rank_out_of_core(corpus, tolerance, count)
+    else:
+        method = "jacobi" if engine == "iterate" else engine
+        ranks = pagerank.iterate_pagerank(corpus, pagerank.DAMPING, tolerance,
+                                          method=method, callback=count)
+    rank_time = time.perf_counter() - start
+
+    return {
+        "pages": len(corpus),
+        "links": sum(len(links) for links in corpus.values()),
+        "crawl_seconds": crawl_time,
+        "rank_seconds": rank_time,
+        "iterations": iterations[0] or None,
+        "l1_error": sum(abs(ranks.get(page, 0) - reference[page])
+                        for page in reference),
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    }
+
+
+def rank_out_of_core(corpus, tolerance, callback):
+    """
+    Writes a corpus as an edge list to a temporary directory and ranks
+    it with `outofcore_pagerank`, timing the conversion along with it.
+    """
+    pages = sorted(corpus)
+    with tempfile.TemporaryDirectory() as directory:
+        prefix = os.path.join(directory, "corpus")
+        write_edge_list(prefix, pages,
+                        ((page, corpus[page]) for page in pages))
+        sort_by_destination(prefix)
+        ranks, _ = outofcore_pagerank(prefix, pagerank.DAMPING, tolerance,
+                                      callback=callback)
+    return dict(zip(pages, ranks.tolist()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Parallel, streaming crawler for large local mirrors of HTML pages.
+
+Usage: python crawler.py directory output [--workers N] [--processes]
+
+Pages are found recursively, and each one is read in chunks through an
+incremental link extractor on a pool of threads (or processes), so no
+whole file is ever held in memory. Links are resolved relative to the
+linking page and normalized, and only links to other pages in the
+corpus are kept. The corpus is written as a compact edge list: a text
+file of page names, one per line, and a binary file of (source,
+destination) page number pairs as little-endian 32-bit integers.
+"""
+import argparse
+import concurrent.futures
+import os
+import posixpath
+import re
+
+import numpy as np
+
+# Bytes read from a page at a time
+CHUNK = 1 << 16
+
+# Same pattern as `crawl` in pagerank.py
+LINK = re.compile(r"<a\s+(?:[^>]*?)href=\"([^\"]*)\"")
+
+# hrefs with a scheme (http:, mailto:, ...) point outside the corpus
+SCHEME = re.compile(r"^[a-zA-Z][a-zA-Z0-9+.-]*:")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("directory")
+    parser.add_argument("output", help="path prefix for .pages and .edges")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--processes", action="store_true",
+                        help="scan pages in processes instead of threads")
+    parser.add_argument("--no-recursive", action="store_true",
+                        help="only scan the top level of the directory")
+    args = parser.parse_args()
+
+    pages = find_pages(args.directory, not args.no_recursive)
+    count = write_edge_list(args.output, pages, scan_pages(
+        args.directory, pages, args.workers, args.processes
+    ))
+    print(f"{len(pages)} pages, {count} links.")
+
+
+class LinkExtractor():
+    """
+    Finds hrefs of <a> tags in text fed to it a chunk at a time.
+    """
+
+    def __init__(self):
+        self.pending = ""
+
+    def feed(self, chunk):
+        """
+        Returns the hrefs of tags completed by `chunk`. Text after the
+        last '>' may be part of an unfinished tag, so it is held back
+        until the next chunk.
+        """
+        text = self.pending + chunk
+        end = text.rfind(">") + 1
+        self.pending = text[end:]
+        return LINK.findall(text, 0, end)
+
+    def close(self):
+        """Returns the hrefs in any text still held back."""
+        text, self.pending = self.pending, ""
+        return LINK.findall(text)
+
+
+def find_pages(directory, recursive=True):
+    """
+    Return a sorted list of the .html files under `directory`, named by
+    their path relative to it with '/' separators.
+    """
+    pages = []
+    for root, dirs, files in os.walk(directory):
+        if not recursive:
+            dirs.clear()
+        dirs.sort()
+        relative = os.path.relpath(root, directory)
+        for filename in files:
+            if filename.endswith(".html"):
+                path = filename if relative == "." else os.path.join(
+                    relative, filename
+                )
+                pages.append(path.replace(os.sep, "/"))
+    return sorted(pages)
+
+
+def normalize(page, href):
+    """
+    Return the page name an href on `page` refers to, or None if it
+    points outside the directory.
+    """
+    href = href.split("#", 1)[0].split("?", 1)[0]
+    if not href or SCHEME.match(href) or href.startswith("//"):
+        return None
+    if href.startswith("/"):
+        path = href.lstrip("/")
+    else:
+        path = posixpath.join(posixpath.dirname(page), href)
+    path = posixpath.normpath(path)
+    if path.startswith("../") or path == "..":
+        return None
+    return path
+
+
+def page_links(directory, page):
+    """
+    Return the set of normalized links on a page, streaming the file.
+    """
+    extractor = LinkExtractor()
+    hrefs = []
+    with open(os.path.join(directory, page), encoding="utf-8",
+              errors="replace") as f:
+        while True:
+            chunk = f.read(CHUNK)
+            if not chunk:
+                break
+            hrefs.extend(extractor.feed(chunk))
+    hrefs.extend(extractor.close())
+    return {link for link in (normalize(page, href) for href in hrefs)
+            if link is not None}
+
+
+def scan_pages(directory, pages, workers=None, processes=False):
+    """
+    Yields (page, links) for each page, in order, scanning pages on a
+    pool of `workers` threads (or processes). Links are limited to
+    other pages in `pages`.
+    """
+    known = set(pages)
+    if processes:
+        executor = concurrent.futures.ProcessPoolExecutor(workers)
+    else:
+        executor = concurrent.futures.ThreadPoolExecutor(workers)
+    with executor:
+        results = executor.map(page_links, [directory] * len(pages), pages,
+                               chunksize=64 if processes else 1)
+        for page, links in zip(pages, results):
+            yield page, (links & known) - {page}
+
+
+def parallel_crawl(directory, workers=None, processes=False,
+                   recursive=True):
+    """
+    Return a corpus dictionary like `crawl`, scanning pages in parallel.
+    """
+    pages = find_pages(directory, recursive)
+    return dict(scan_pages(directory, pages, workers, processes))
+
+
+def write_edge_list(path, pages, scanned):
+    """
+    Writes `pages` to `path`.pages and the links in `scanned`, an
+    iterable of (page, links) pairs, to `path`.edges as they arrive.
+    Return the number of links written.
+    """
+    index = {page: i for i, page in enumerate(pages)}
+    with open(f"{path}.pages", "w", encoding="utf-8") as f:
+        for page in pages:
+            f.write(f"{page}\n")
+
+    count = 0
+    with open(f"{path}.edges", "wb") as f:
+        for page, links in scanned:
+            if not links:
+                continue
+            edges = np.empty((len(links), 2), dtype="<i4")
+            edges[:, 0] = index[page]
+            edges[:, 1] = sorted(index[link] for link in links)
+            f.write(edges.tobytes())
+            count += len(links)
+    return count
+
+
+def read_edge_list(path):
+    """
+    Return (pages, edges) for an edge list, where `edges` is a
+    memory-mapped array of (source, destination) rows.
+    """
+    with open(f"{path}.pages", encoding="utf-8") as f:
+        pages = [line.rstrip("\n") for line in f]
+    if os.path.getsize(f"{path}.edges") == 0:
+        return pages, np.empty((0, 2), dtype="<i4")
+    edges = np.memmap(f"{path}.edges", dtype="<i4", mode="r").reshape(-1, 2)
+    return pages, edges
+
+
+def edge_list_corpus(pages, edges):
+    """
+    Return a corpus dictionary, as used by pagerank.py, for an edge list.
+    """
+    corpus = {page: set() for page in pages}
+    for source, destination in edges.tolist():
+        corpus[pages[source]].add(pages[destination])
+    return corpus
+
+
+if __name__ == "__main__":
+    main()
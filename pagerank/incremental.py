@@ -0,0 +1,175 @@
+"""
+Incremental PageRank for a corpus that changes between runs.
+
+Usage: python incremental.py corpus [--state path] [--hash]
+
+Each run saves the corpus's pages, a fingerprint of each page file,
+every page's links and the final ranks to a state file. The next run
+rescans only pages that were added or whose fingerprint changed, reuses
+the stored links of the rest, and starts power iteration from the
+previous ranks instead of from 1 / N, so a small edit to a large site
+converges in a few iterations. Switching between mtime and --hash
+fingerprints rescans every page, but still starts from the old ranks.
+"""
+import argparse
+import hashlib
+import os
+
+import numpy as np
+
+from crawler import find_pages, page_links
+from pagerank import DAMPING
+from sparse import power_iteration, transition_matrix
+
+# Name of the state file kept in the corpus directory by default
+STATE = ".pagerank-state.npz"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("corpus")
+    parser.add_argument("--state", help=f"state file (default corpus/{STATE})")
+    parser.add_argument("--hash", action="store_true",
+                        help="detect changes by content hash, not mtime")
+    parser.add_argument("--tolerance", type=float, default=0.001)
+    args = parser.parse_args()
+
+    ranks, report = incremental_pagerank(
+        args.corpus, DAMPING, args.state, args.hash, args.tolerance
+    )
+    print(f"{report['added']} added, {report['removed']} removed, "
+          f"{report['changed']} changed, {report['unchanged']} unchanged, "
+          f"{report['rescanned']} rescanned.")
+    print(f"Converged in {report['iterations']} iterations.")
+    for page in sorted(ranks):
+        print(f"  {page}: {ranks[page]:.4f}")
+
+
+def incremental_pagerank(directory, damping_factor, state=None,
+                         use_hash=False, tolerance=0.001):
+    """
+    Return (ranks, report) for the corpus in `directory`, updating the
+    state file `state` from the previous run (if any): `ranks` is a
+    dictionary of PageRank values like `iterate_pagerank`'s, and
+    `report` counts added, removed, changed and unchanged pages, pages
+    rescanned because the previous run fingerprinted them the other
+    way (by mtime rather than hash, or vice versa), and the iterations
+    taken.
+    """
+    if state is None:
+        state = os.path.join(directory, STATE)
+    previous = load_state(state)
+    rescan = previous is not None and previous["hashed"] != use_hash
+
+    pages = find_pages(directory)
+    fingerprints = [fingerprint(directory, page, use_hash) for page in pages]
+
+    # Reuse the links of pages whose fingerprint is unchanged
+    links = {}
+    report = {"added": 0, "removed": 0, "changed": 0, "unchanged": 0,
+              "rescanned": 0}
+    old = {} if previous is None else previous["pages"]
+    for page, page_fingerprint in zip(pages, fingerprints):
+        if page not in old:
+            report["added"] += 1
+            links[page] = page_links(directory, page)
+        elif rescan:
+            report["rescanned"] += 1
+            links[page] = page_links(directory, page)
+        elif old[page]["fingerprint"] != page_fingerprint:
+            report["changed"] += 1
+            links[page] = page_links(directory, page)
+        else:
+            report["unchanged"] += 1
+            links[page] = old[page]["links"]
+    report["removed"] = len(set(old) - set(pages))
+
+    # Only links to other pages in the corpus count
+    known = set(pages)
+    corpus = {page: (links[page] & known) - {page} for page in pages}
+    names, matrix, dangling = transition_matrix(corpus)
+
+    # Warm start from the previous ranks; new pages start at 1 / N
+    start = None
+    if previous is not None and names:
+        start = np.array([old[page]["rank"] if page in old else 1 / len(names)
+                          for page in names])
+    ranks, iterations = power_iteration(matrix, dangling, damping_factor,
+                                        tolerance, start)
+    report["iterations"] = iterations
+
+    save_state(state, names, dict(zip(pages, fingerprints)), links, ranks,
+               use_hash)
+    return dict(zip(names, ranks.tolist())), report
+
+
+def fingerprint(directory, page, use_hash=False):
+    """
+    Return a string of a page file's size and modification time or, if
+    `use_hash` is true, a hash of its contents.
+    """
+    path = os.path.join(directory, page)
+    if not use_hash:
+        stat = os.stat(path)
+        return f"{stat.st_size}:{stat.st_mtime_ns}"
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def save_state(path, pages, fingerprints, links, ranks, use_hash):
+    """
+    Saves the pages, fingerprints, links (as indices into a table of
+    link names, which may include pages not in the corpus yet) and
+    ranks of a run.
+    """
+    targets = sorted(set().union(*links.values())) if links else []
+    index = {target: i for i, target in enumerate(targets)}
+    edges = np.array(
+        [(i, index[link]) for i, page in enumerate(pages)
+         for link in sorted(links[page])],
+        dtype=np.int32
+    ).reshape(-1, 2)
+    with open(path, "wb") as f:
+        np.savez(
+            f,
+            pages=np.array(pages, dtype=np.str_),
+            fingerprints=np.array([fingerprints[page] for page in pages],
+                                  dtype=np.str_),
+            targets=np.array(targets, dtype=np.str_),
+            edges=edges,
+            ranks=ranks,
+            hashed=np.array(use_hash)
+        )
+
+
+def load_state(path):
+    """
+    Return the previous run's state as {"hashed": bool, "pages": {page:
+    {"fingerprint", "links", "rank"}}}, or None if there is none.
+    """
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as data:
+        pages = data["pages"].tolist()
+        targets = data["targets"].tolist()
+        state = {
+            "hashed": bool(data["hashed"]),
+            "pages": {
+                page: {"fingerprint": page_fingerprint, "links": set(),
+                       "rank": rank}
+                for page, page_fingerprint, rank in zip(
+                    pages, data["fingerprints"].tolist(),
+                    data["ranks"].tolist()
+                )
+            }
+        }
+        for source, target in data["edges"].tolist():
+            state["pages"][pages[source]]["links"].add(targets[target])
+    return state
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Out-of-core PageRank over memory-mapped edge lists.
+
+Usage: python outofcore.py edges [--top N] [--tolerance T] ...
+
+`edges` is the path prefix of an edge list written by crawler.py
+(`edges`.pages and `edges`.edges). It is first converted, in blocks,
+into a destination-sorted (CSC) form on disk:
+
+    `edges`.offsets.npy    in-link offsets, one per page plus one
+    `edges`.sources.npy    source page of every link, by destination
+    `edges`.degrees.npy    number of links on each page
+
+Each iteration then streams over the sources in blocks of about BLOCK
+links, so only a few vectors of one value per page are held in memory,
+and the graph itself can be larger than memory.
+"""
+import argparse
+import os
+
+import numpy as np
+
+from crawler import read_edge_list
+from pagerank import DAMPING
+
+# Links processed at a time
+BLOCK = 1 << 22
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("edges", help="path prefix of a crawler edge list")
+    parser.add_argument("--top", type=int, default=20,
+                        help="number of highest ranked pages to print")
+    parser.add_argument("--tolerance", type=float, default=0.001)
+    parser.add_argument("--max-iterations", type=int)
+    parser.add_argument("--block", type=int, default=BLOCK,
+                        help="links processed at a time")
+    args = parser.parse_args()
+
+    if not is_sorted_current(args.edges):
+        sort_by_destination(args.edges, args.block)
+    ranks, iterations = outofcore_pagerank(
+        args.edges, DAMPING, args.tolerance, args.max_iterations,
+        block=args.block
+    )
+    pages, _ = read_edge_list(args.edges)
+    print(f"PageRank Results from {iterations} Out-of-Core Iterations")
+    for i in np.argsort(-ranks, kind="stable")[:args.top]:
+        print(f"  {pages[i]}: {ranks[i]:.4f}")
+
+
+def is_sorted_current(prefix):
+    """
+    Return whether the sorted form of an edge list exists and is newer
+    than the edge list itself.
+    """
+    try:
+        sorted_time = min(os.path.getmtime(f"{prefix}.{name}.npy")
+                          for name in ["offsets", "sources", "degrees"])
+    except OSError:
+        return False
+    return sorted_time >= os.path.getmtime(f"{prefix}.edges")
+
+
+def sort_by_destination(prefix, block=BLOCK):
+    """
+    Converts an edge list to destination-sorted form in two passes of
+    `block` links at a time: one to count each page's links and
+    in-links, and one to scatter each link's source into place.
+    """
+    pages, edges = read_edge_list(prefix)
+    N = len(pages)
+    E = len(edges)
+
+    in_degrees = np.zeros(N, dtype=np.int64)
+    degrees = np.zeros(N, dtype=np.int64)
+    for start in range(0, E, block):
+        chunk = np.asarray(edges[start:start + block])
+        degrees += np.bincount(chunk[:, 0], minlength=N)
+        in_degrees += np.bincount(chunk[:, 1], minlength=N)
+
+    offsets = np.zeros(N + 1, dtype=np.int64)
+    np.cumsum(in_degrees, out=offsets[1:])
+    np.save(f"{prefix}.offsets.npy", offsets)
+    np.save(f"{prefix}.degrees.npy", degrees.astype(np.int32))
+
+    sources = np.lib.format.open_memmap(
+        f"{prefix}.sources.npy", mode="w+", dtype=np.int32, shape=(E,)
+    )
+    cursor = offsets[:-1].copy()
+    for start in range(0, E, block):
+        chunk = np.asarray(edges[start:start + block])
+        order = np.argsort(chunk[:, 1], kind="stable")
+        destinations = chunk[order, 1]
+
+        # Number each link within its run of equal destinations
+        starts = np.flatnonzero(
+            np.r_[True, destinations[1:] != destinations[:-1]]
+        )
+        counts = np.diff(np.r_[starts, len(destinations)])
+        within = np.arange(len(destinations)) - np.repeat(starts, counts)
+
+        sources[cursor[destinations] + within] = chunk[order, 0]
+        cursor[destinations[starts]] += counts
+    sources.flush()
+    del sources
+
+
+def outofcore_pagerank(prefix, damping_factor, tolerance=0.001,
+                       max_iterations=None, callback=None, block=BLOCK):
+    """
+    Return (ranks, iterations) for a destination-sorted edge list,
+    iterating like `iterate_pagerank` (with the same stop rule on the
+    largest change of any page) while streaming the links from disk.
+    `callback(iteration, residual)` is called after every iteration.
+    """
+    offsets = np.load(f"{prefix}.offsets.npy", mmap_mode="r")
+    sources = np.load(f"{prefix}.sources.npy", mmap_mode="r")
+    degrees = np.load(f"{prefix}.degrees.npy")
+    N = len(degrees)
+    dangling = degrees == 0
+
+    # Destination ranges holding about `block` links each
+    bounds = np.unique(np.r_[
+        0,
+        np.searchsorted(offsets, np.arange(0, offsets[-1], block),
+                        side="right") - 1,
+        N
+    ])
+
+    ranks = np.full(N, 1 / N)
+    iterations = 0
+    while True:
+        iterations += 1
+        share = np.divide(ranks, degrees, out=np.zeros(N), where=~dangling)
+        new_ranks = np.empty(N)
+        base = (1 - damping_factor) / N + (
+            damping_factor * ranks[dangling].sum() / N
+        )
+        for low, high in zip(bounds[:-1], bounds[1:]):
+            first, last = offsets[low], offsets[high]
+            totals = np.zeros(last - first + 1)
+            np.cumsum(share[sources[first:last]], out=totals[1:])
+            in_links = offsets[low:high + 1] - first
+            new_ranks[low:high] = base + damping_factor * (
+                totals[in_links[1:]] - totals[in_links[:-1]]
+            )
+        new_ranks /= new_ranks.sum()
+
+        residual = float(np.abs(new_ranks - ranks).max())
+        if callback is not None:
+            callback(iterations, residual)
+        if residual <= tolerance or iterations == max_iterations:
+            return new_ranks, iterations
+        ranks = new_ranks
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,84 @@
+import argparse
 import os
 import random
 import re
 import sys
 
+from sampler import vectorized_sample_pagerank
+from sparse import personalized_pagerank, sparse_pagerank
+
 DAMPING = 0.85
 SAMPLES = 10000
 
+# Iteration methods and residual norms of iterate_pagerank
+METHODS = ["jacobi", "gauss-seidel", "aitken", "quadratic"]
+NORMS = ["max", "l1"]
+
+# Iterations between Aitken or quadratic extrapolations
+EXTRAPOLATION_PERIOD = 10
+
 
 def main():
-    if len(sys.argv) != 2:
-        sys.exit("Usage: python pagerank.py corpus")
-    corpus = crawl(sys.argv[1])
-    ranks = sample_pagerank(corpus, DAMPING, SAMPLES)
-    print(f"PageRank Results from Sampling (n = {SAMPLES})")
+    parser = argparse.ArgumentParser()
+    parser.add_argument("corpus")
+    parser.add_argument("--samples", type=int, default=SAMPLES)
+    parser.add_argument("--vectorized", action="store_true",
+                        help="sample with batches of NumPy random surfers")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processes to sample in (with --vectorized)")
+    parser.add_argument("--sparse", action="store_true",
+                        help="iterate with sparse matrix products")
+    parser.add_argument("--tolerance", type=float, default=0.001,
+                        help="stop iterating once the residual is this small")
+    parser.add_argument("--norm", choices=NORMS, default="max",
+                        help="how to measure the residual")
+    parser.add_argument("--max-iterations", type=int)
+    parser.add_argument("--method", choices=METHODS, default="jacobi",
+                        help="iteration method (not with --sparse)")
+    parser.add_argument("--residuals", action="store_true",
+                        help="print the residual after every iteration")
+    parser.add_argument("--personalize", nargs="+", metavar="PAGE",
+                        help="also print PageRank personalized to these pages")
+    args = parser.parse_args()
+
+    corpus = crawl(args.corpus)
+    for page in args.personalize or []:
+        if page not in corpus:
+            sys.exit(f"Page not found: {page}")
+    if args.vectorized:
+        ranks = vectorized_sample_pagerank(corpus, DAMPING, args.samples,
+                                           workers=args.workers)
+    else:
+        ranks = sample_pagerank(corpus, DAMPING, args.samples)
+    print(f"PageRank Results from Sampling (n = {args.samples})")
     for page in sorted(ranks):
         print(f"  {page}: {ranks[page]:.4f}")
-    ranks = iterate_pagerank(corpus, DAMPING)
+    options = {
+        "tolerance": args.tolerance,
+        "norm": args.norm,
+        "max_iterations": args.max_iterations,
+        "callback": print_residual if args.residuals else None
+    }
+    if args.sparse:
+        ranks = sparse_pagerank(corpus, DAMPING, **options)
+    else:
+        ranks = iterate_pagerank(corpus, DAMPING, method=args.method,
+                                 **options)
     print(f"PageRank Results from Iteration")
     for page in sorted(ranks):
         print(f"  {page}: {ranks[page]:.4f}")
+    if args.personalize:
+        options["callback"] = None
+        ranks = personalized_pagerank(corpus, DAMPING, args.personalize,
+                                      **options)
+        seeds = ", ".join(args.personalize)
+        print(f"PageRank Results Personalized to {seeds}")
+        for page in sorted(ranks):
+            print(f"  {page}: {ranks[page]:.4f}")
+
+
+def print_residual(iteration, residual):
+    print(f"  Iteration {iteration}: residual {residual:.3e}")
 
 
 def crawl(directory):
@@ -113,66 +173,170 @@ def sample_pagerank(corpus, damping_factor, n):
     raise NotImplementedError
 
 
-def iterate_pagerank(corpus, damping_factor):
+def iterate_pagerank(corpus, damping_factor, tolerance=0.001, norm="max",
+                     max_iterations=None, method="jacobi", callback=None):
     """
     Return PageRank values for each page by iteratively updating
     PageRank values until convergence.
 
+    Iteration stops once the residual (the change in PageRank between
+    iterations, measured by `norm`: "max" for the largest change of
+    any page or "l1" for the sum of all changes) is at most `tolerance`,
+    or after `max_iterations` iterations. `callback(iteration,
+    residual)` is called after every iteration.
+
+    `method` is one of METHODS: "jacobi" computes each iteration from
+    the last one, and "gauss-seidel" uses each page's new PR as soon as
+    it is computed. "aitken" and "quadratic" iterate like "jacobi" but
+    every EXTRAPOLATION_PERIOD iterations replace PR by an extrapolation
+    of the last few iterations (see `aitken_extrapolate` and
+    `quadratic_extrapolate`); Aitken only helps when one eigenvalue
+    dominates the error, while quadratic extrapolation is safer.
+
     Return a dictionary where keys are page names, and values are
     their estimated PageRank value (a value between 0 and 1). All
     PageRank values should sum to 1.
     """
+    if method not in METHODS:
+        raise ValueError(f"unknown method: {method}")
+    if norm not in NORMS:
+        raise ValueError(f"unknown norm: {norm}")
 
     #  Initialize set of all pages, reversed corpus and starting PR
-    all_pages = set(corpus.keys())
+    all_pages = sorted(corpus.keys())
     N = len(all_pages)
     reversed_corpus = linked_by(corpus)
+    dangling = dangling_pages(corpus)
     current_pagerank = {x: 1 / N for x in all_pages}
+    history = []
+    iteration = 0
     
     # Iterate the algorithm
     while True:
-        new_pagerank = {x: 0 for x in all_pages}
-        for p in new_pagerank.keys():
+        iteration += 1
+
+        #  Gauss-Seidel updates PR in place, so later pages see new values
+        if method == "gauss-seidel":
+            new_pagerank = dict(current_pagerank)
+            source = new_pagerank
+        else:
+            new_pagerank = {x: 0 for x in all_pages}
+            source = current_pagerank
+
+        #  pages with no links share their PR evenly with every page
+        dangling_sum = sum(source[i] for i in dangling)
+
+        for p in all_pages:
             
             #  calculate PR of all pages that link to p to update the PR of p
-            pagerank_i = 0
+            pagerank_i = dangling_sum / N
             for i in reversed_corpus[p]:
-                if len(corpus[i]) == 0:
-                    pagerank_i += current_pagerank[i] / len(all_pages)
-                else:
-                    pagerank_i += current_pagerank[i] / len(corpus[i])
-            new_pagerank[p] = (1 - damping_factor) / N + pagerank_i * damping_factor
+                pagerank_i += source[i] / len(corpus[i])
+            pr = (1 - damping_factor) / N + pagerank_i * damping_factor
+            if source is new_pagerank and p in dangling:
+                dangling_sum += pr - new_pagerank[p]
+            new_pagerank[p] = pr
         
         #  normalise
         factor = 1.0 / sum(new_pagerank.values())
         new_pagerank = {i: j * factor for i, j in new_pagerank.items()}
         
-        #  Set stop condition as less than 0.001 change of PR 
-        finished = True
-        for p, pr in new_pagerank.items():
-            if abs(pr - current_pagerank[p]) > 0.001:
-                finished = False
-        if finished == True:
-            return new_pagerank 
+        #  Stop once the change of PR is within tolerance
+        changes = [abs(pr - current_pagerank[p])
+                   for p, pr in new_pagerank.items()]
+        residual = max(changes) if norm == "max" else sum(changes)
+        if callback is not None:
+            callback(iteration, residual)
+        if residual <= tolerance or iteration == max_iterations:
+            return new_pagerank
+
+        if method in ["aitken", "quadratic"]:
+            history = (history + [current_pagerank])[-3:]
+            if iteration % EXTRAPOLATION_PERIOD == 0 and len(history) == 3:
+                if method == "aitken":
+                    new_pagerank = aitken_extrapolate(
+                        history[1], history[2], new_pagerank
+                    )
+                else:
+                    new_pagerank = quadratic_extrapolate(
+                        *history, new_pagerank
+                    )
         current_pagerank = new_pagerank
 
 
-    raise NotImplementedError
+def aitken_extrapolate(x0, x1, x2):
+    """
+    Return the Aitken extrapolation of three successive PageRank
+    dictionaries, page by page, normalised to sum to 1. Pages whose
+    extrapolation is undefined or not positive keep their value in x2.
+    """
+    result = {}
+    for p in x2:
+        denominator = x2[p] - 2 * x1[p] + x0[p]
+        pr = x2[p]
+        if abs(denominator) > 1e-15:
+            pr = x2[p] - (x2[p] - x1[p]) ** 2 / denominator
+        result[p] = pr if pr > 0 else x2[p]
+    factor = 1.0 / sum(result.values())
+    return {i: j * factor for i, j in result.items()}
+
+
+def quadratic_extrapolate(x0, x1, x2, x3):
+    """
+    Return the quadratic extrapolation (Kamvar et al., 2003) of four
+    successive PageRank dictionaries, normalised to sum to 1: the
+    combination of x1, x2 and x3 that cancels the error along the two
+    directions fitted, by least squares, to the last three steps.
+    Pages whose extrapolation is not positive keep their value in x3.
+    """
+    y1 = {p: x1[p] - x0[p] for p in x3}
+    y2 = {p: x2[p] - x0[p] for p in x3}
+    y3 = {p: x3[p] - x0[p] for p in x3}
+
+    #  Solve the 2x2 normal equations for the least squares fit
+    a11 = sum(y1[p] * y1[p] for p in x3)
+    a12 = sum(y1[p] * y2[p] for p in x3)
+    a22 = sum(y2[p] * y2[p] for p in x3)
+    b1 = -sum(y1[p] * y3[p] for p in x3)
+    b2 = -sum(y2[p] * y3[p] for p in x3)
+    determinant = a11 * a22 - a12 * a12
+    if abs(determinant) < 1e-300:
+        return x3
+    gamma1 = (b1 * a22 - b2 * a12) / determinant
+    gamma2 = (a11 * b2 - a12 * b1) / determinant
 
+    beta0 = gamma1 + gamma2 + 1
+    beta1 = gamma2 + 1
+    result = {}
+    for p in x3:
+        pr = beta0 * x1[p] + beta1 * x2[p] + x3[p]
+        result[p] = pr if pr > 0 else x3[p]
+    factor = 1.0 / sum(result.values())
+    return {i: j * factor for i, j in result.items()}
 
 
 def linked_by(corpus):
-    
-    #  generate a dictionary in which each page corresponds to all pages it links to
-    all_pages = set(corpus.keys())
-    reversed_corpus = {x: set() for x in all_pages}
-    for p1 in all_pages:
-        for p2 in all_pages:
-            if p1 in corpus[p2] or len(corpus[p2]) == 0:
-                reversed_corpus[p1].add(p2)
+    """
+    Return a dictionary mapping each page to the set of pages that
+    link to it, built in one pass over the links of `corpus`.
+
+    Pages with no links are not included as linking to anything; see
+    `dangling_pages`.
+    """
+    reversed_corpus = {x: set() for x in corpus}
+    for page, links in corpus.items():
+        for link in links:
+            reversed_corpus[link].add(page)
     return reversed_corpus
 
 
+def dangling_pages(corpus):
+    """
+    Return the set of pages with no links, which are treated as
+    linking to every page in the corpus (including themselves).
+    """
+    return {page for page, links in corpus.items() if len(links) == 0}
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,129 @@
+"""
+Vectorized random-surfer sampling of PageRank.
+
+The corpus is converted once into a link table: page i's links are
+`targets[offsets[i]:offsets[i + 1]]`. Many independent surfers then
+take a step at once with a few NumPy operations: each follows a link
+chosen uniformly from its page's slice with probability
+`damping_factor` (if the page has links), and otherwise jumps to a
+page chosen uniformly from the corpus, as in `transition_model`.
+Visits are counted with `np.bincount`.
+
+Surfers start at uniformly random pages, and each takes only about
+n / WALKERS counted steps, so they first walk a burn-in without
+counting, until their start has almost no effect on where they are.
+"""
+import math
+import multiprocessing
+
+import numpy as np
+
+# Number of surfers walking at once in each process
+WALKERS = 1024
+
+# Largest effect a surfer's random start may have on its counted visits
+START_BIAS = 0.001
+
+
+def link_table(corpus):
+    """
+    Return (pages, offsets, targets) for a corpus: a sorted list of its
+    pages and the CSR arrays of each page's links.
+    """
+    pages = sorted(corpus)
+    index = {page: i for i, page in enumerate(pages)}
+    degree = np.array([len(corpus[page]) for page in pages], dtype=np.int64)
+    offsets = np.zeros(len(pages) + 1, dtype=np.int64)
+    np.cumsum(degree, out=offsets[1:])
+    targets = np.fromiter(
+        (index[link] for page in pages for link in sorted(corpus[page])),
+        dtype=np.int64, count=offsets[-1]
+    )
+    return pages, offsets, targets
+
+
+def burn_in(damping_factor):
+    """
+    Return how many steps a surfer takes before its visits count.
+
+    A surfer forgets its start at its first random jump, which it takes
+    with probability at least 1 - `damping_factor` at every step, so
+    after k steps its start affects it with probability at most
+    `damping_factor` ** k.
+    """
+    if not 0 < damping_factor < 1:
+        return 0
+    return math.ceil(math.log(START_BIAS) / math.log(damping_factor))
+
+
+def walk(offsets, targets, damping_factor, n, walkers, seed):
+    """
+    Return visit counts for each page from `n` samples taken by
+    `walkers` surfers stepping in lockstep, each starting at a random
+    page and walking a burn-in first, with random numbers drawn from
+    `seed`.
+    """
+    rng = np.random.default_rng(seed)
+    N = len(offsets) - 1
+    degree = np.diff(offsets)
+    counts = np.zeros(N, dtype=np.int64)
+    walkers = max(1, min(walkers, n))
+
+    def step(current):
+        # Follow a random link with probability damping_factor, unless
+        # the page has none; otherwise jump to a random page
+        page_degree = degree[current]
+        follow = (rng.random(walkers) < damping_factor) & (page_degree > 0)
+        jump = rng.integers(N, size=walkers)
+        if len(targets) == 0:
+            return jump
+
+        # Pages with no links point one past their slice, so clip
+        # them into range; they never follow it
+        choice = offsets[current] + (
+            rng.random(walkers) * page_degree
+        ).astype(np.int64)
+        choice = np.minimum(choice, len(targets) - 1)
+        return np.where(follow, targets[choice], jump)
+
+    current = rng.integers(N, size=walkers)
+    for _ in range(burn_in(damping_factor)):
+        current = step(current)
+
+    remaining = n
+    while True:
+        visited = current if remaining >= walkers else current[:remaining]
+        counts += np.bincount(visited, minlength=N)
+        remaining -= len(visited)
+        if remaining <= 0:
+            return counts
+        current = step(current)
+
+
+def vectorized_sample_pagerank(corpus, damping_factor, n, walkers=WALKERS,
+                               workers=1, seed=None):
+    """
+    Return PageRank values for each page by sampling `n` pages with
+    batches of random surfers, like `sample_pagerank`.
+
+    With `workers` above one, the samples are split across a pool of
+    processes, each drawing from its own independent random stream
+    spawned from `seed`.
+
+    Return a dictionary where keys are page names, and values are
+    their estimated PageRank value (a value between 0 and 1). All
+    PageRank values should sum to 1.
+    """
+    pages, offsets, targets = link_table(corpus)
+    streams = np.random.SeedSequence(seed).spawn(workers)
+    shares = [n // workers + (i < n % workers) for i in range(workers)]
+    tasks = [(offsets, targets, damping_factor, share, walkers, stream)
+             for share, stream in zip(shares, streams) if share > 0]
+
+    if len(tasks) == 1:
+        counts = walk(*tasks[0])
+    else:
+        context = multiprocessing.get_context("fork")
+        with context.Pool(len(tasks)) as pool:
+            counts = sum(pool.starmap(walk, tasks))
+    return dict(zip(pages, (counts / counts.sum()).tolist()))
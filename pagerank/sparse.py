@@ -0,0 +1,153 @@
+"""
+Vectorized PageRank over a sparse transition matrix.
+
+The corpus is converted once into a SciPy CSR matrix M, where
+M[i, j] = 1 / (number of links on page j) if page j links to page i,
+and a boolean vector marking dangling pages (pages with no links).
+Each iteration is then one sparse matrix-vector product: a dangling
+page's rank is spread evenly over every page, as in `iterate_pagerank`.
+
+Personalized PageRank replaces the uniform teleport distribution with
+one concentrated on seed pages; many personalizations can share the
+matrix by iterating an N x K block of rank vectors at once.
+"""
+import numpy as np
+import scipy.sparse
+
+
+def transition_matrix(corpus):
+    """
+    Return (pages, matrix, dangling) for a corpus: a sorted list of its
+    pages, the column-stochastic CSR transition matrix over them (with
+    empty columns for dangling pages) and a boolean dangling mask.
+    """
+    pages = sorted(corpus)
+    index = {page: i for i, page in enumerate(pages)}
+    N = len(pages)
+
+    sources = []
+    destinations = []
+    for page, links in corpus.items():
+        for link in links:
+            sources.append(index[page])
+            destinations.append(index[link])
+    sources = np.array(sources, dtype=np.int64)
+    destinations = np.array(destinations, dtype=np.int64)
+
+    out_degree = np.bincount(sources, minlength=N)
+    weights = 1.0 / out_degree[sources]
+    matrix = scipy.sparse.csr_matrix(
+        (weights, (destinations, sources)), shape=(N, N)
+    )
+    return pages, matrix, out_degree == 0
+
+
+def power_iteration(matrix, dangling, damping_factor, tolerance=0.001,
+                    start=None, norm="max", max_iterations=None,
+                    callback=None, teleport=None):
+    """
+    Return (ranks, iterations): the PageRank vector for a transition
+    matrix and the number of iterations taken, iterating from `start`
+    (the teleport distribution if None) until the change in ranks,
+    measured by `norm` ("max" or "l1", as in `iterate_pagerank`), is
+    at most `tolerance`, or for at most `max_iterations` iterations.
+    `callback(iteration, residual)` is called after every iteration.
+
+    `teleport` is the distribution random jumps (and the rank of
+    dangling pages) go to: uniform if None, a vector of N weights
+    summing to 1, or an N x K matrix whose K columns are computed
+    together, giving an N x K matrix of ranks.
+    """
+    N = matrix.shape[0]
+    if teleport is None:
+        teleport = np.full(N, 1 / N)
+    if start is None:
+        ranks = np.array(teleport, dtype=np.float64)
+    else:
+        ranks = np.asarray(start, dtype=np.float64) / np.sum(start)
+    iterations = 0
+    while True:
+        iterations += 1
+        dangling_mass = ranks[dangling].sum(axis=0)
+        new_ranks = damping_factor * (matrix @ ranks) + (
+            (1 - damping_factor) + damping_factor * dangling_mass
+        ) * teleport
+        new_ranks /= new_ranks.sum(axis=0)
+        changes = np.abs(new_ranks - ranks)
+        if norm == "max":
+            residual = changes.max()
+        else:
+            residual = changes.sum(axis=0).max()
+        if callback is not None:
+            callback(iterations, float(residual))
+        if residual <= tolerance or iterations == max_iterations:
+            return new_ranks, iterations
+        ranks = new_ranks
+
+
+def sparse_pagerank(corpus, damping_factor, tolerance=0.001, **options):
+    """
+    Return PageRank values for each page, like `iterate_pagerank`, by
+    power iteration over a sparse transition matrix. `options` are
+    passed on to `power_iteration`.
+
+    Return a dictionary where keys are page names, and values are
+    their estimated PageRank value (a value between 0 and 1). All
+    PageRank values should sum to 1.
+    """
+    pages, matrix, dangling = transition_matrix(corpus)
+    ranks, _ = power_iteration(matrix, dangling, damping_factor, tolerance,
+                               **options)
+    return dict(zip(pages, ranks.tolist()))
+
+
+def teleport_vector(pages, personalization):
+    """
+    Return the teleport distribution over `pages` for a personalization:
+    either a collection of seed pages, weighted equally, or a dictionary
+    mapping pages to non-negative weights.
+    """
+    index = {page: i for i, page in enumerate(pages)}
+    if not isinstance(personalization, dict):
+        personalization = {page: 1 for page in personalization}
+    vector = np.zeros(len(pages))
+    for page, weight in personalization.items():
+        if page not in index:
+            raise ValueError(f"unknown page: {page}")
+        if weight < 0:
+            raise ValueError(f"negative weight for page: {page}")
+        vector[index[page]] = weight
+    if vector.sum() <= 0:
+        raise ValueError("personalization must give some page weight")
+    return vector / vector.sum()
+
+
+def personalized_pagerank(corpus, damping_factor, personalization,
+                          tolerance=0.001, **options):
+    """
+    Return personalized PageRank values for each page: like
+    `sparse_pagerank`, but random jumps, and the rank of pages with no
+    links, go to pages in proportion to `personalization` (seed pages
+    or page weights, see `teleport_vector`) instead of uniformly.
+    """
+    return personalized_pagerank_batch(
+        corpus, damping_factor, [personalization], tolerance, **options
+    )[0]
+
+
+def personalized_pagerank_batch(corpus, damping_factor, personalizations,
+                                tolerance=0.001, **options):
+    """
+    Return a list of personalized PageRank dictionaries, one for each
+    of `personalizations`, computed together: the teleport vectors form
+    the columns of one dense N x K block, and each iteration is one
+    sparse matrix by dense block product over the shared graph.
+    """
+    pages, matrix, dangling = transition_matrix(corpus)
+    teleport = np.column_stack([
+        teleport_vector(pages, personalization)
+        for personalization in personalizations
+    ])
+    ranks, _ = power_iteration(matrix, dangling, damping_factor, tolerance,
+                               teleport=teleport, **options)
+    return [dict(zip(pages, column.tolist())) for column in ranks.T]
@@ -0,0 +1,51 @@
+import random
+import tempfile
+import unittest
+
+import pagerank
+from benchmark import generate
+from sampler import burn_in, vectorized_sample_pagerank
+from sparse import sparse_pagerank
+
+
+def l1_error(ranks, reference):
+    return sum(abs(ranks.get(page, 0) - reference[page])
+               for page in reference)
+
+
+class TestVectorizedSampling(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with tempfile.TemporaryDirectory() as directory:
+            generate(directory, 500, seed=0)
+            cls.corpus = pagerank.crawl(directory)
+        cls.reference = sparse_pagerank(cls.corpus, pagerank.DAMPING, 1e-10)
+
+    def test_burn_in(self):
+        self.assertEqual(burn_in(0), 0)
+        self.assertEqual(burn_in(1), 0)
+        self.assertLessEqual(pagerank.DAMPING ** burn_in(pagerank.DAMPING),
+                             0.001)
+
+    def test_error_no_worse_than_scalar_sampler(self):
+        scalar = vectorized = 0
+        for seed in range(3):
+            random.seed(seed)
+            scalar += l1_error(pagerank.sample_pagerank(
+                self.corpus, pagerank.DAMPING, pagerank.SAMPLES
+            ), self.reference)
+            vectorized += l1_error(vectorized_sample_pagerank(
+                self.corpus, pagerank.DAMPING, pagerank.SAMPLES, seed=seed
+            ), self.reference)
+        self.assertLessEqual(vectorized, 1.1 * scalar)
+
+    def test_workers_sum_to_one(self):
+        ranks = vectorized_sample_pagerank(self.corpus, pagerank.DAMPING,
+                                           pagerank.SAMPLES, workers=2,
+                                           seed=0)
+        self.assertAlmostEqual(sum(ranks.values()), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()